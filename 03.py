@@ -6,32 +6,17 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtGui import QPalette, QColor, QFont
 from PyQt5.QtCore import Qt
 from PyQt5.QtWebEngineWidgets import QWebEngineView
-from googletrans import Translator
+from cidian_index import open_dict
+from fanyi import TranslationUnavailable, cached_translate, fetch_google, offline_reason
+from yibu_chaci import AsyncLookup, make_debounce_timer
 import urllib.parse
 
-def load_dict(file):
-    d_en2zh = {}
-    with open(file, encoding='utf-8') as f:
-        for idx, line in enumerate(f, 1):
-            line = line.strip()
-            if not line:
-                continue
-            parts = line.split('\t', 1)
-            if len(parts) != 2:
-                continue
-            en, zh = parts
-            en, zh = en.strip(), zh.strip()
-            if en and zh:
-                d_en2zh[en.lower()] = zh
-    return d_en2zh
-
 class NightDict(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle('离线英译中词典（集成百度翻译网页）')
         self.resize(780, 540)
-        self.dict_en2zh = load_dict('dict.txt')
-        self.translator = Translator()
+        self.dict_en2zh = open_dict('dict.txt')
 
         # 美观字体
         font = QFont('微软雅黑', 12)
@@ -97,10 +82,33 @@ class NightDict(QMainWindow):
         container.setLayout(layout)
         self.setCentralWidget(container)
 
+        # 在线查询放到后台线程，新查询作废旧查询；输入停顿后只自动查本地词典，回车/按钮才在线查询
+        self.online = AsyncLookup(self.fetch_online, self)
+        self.online.finished.connect(self.show_online_result)
+        self.debounce = make_debounce_timer(self, self.lookup_local)
         self.btn.clicked.connect(self.lookup)
         self.input.returnPressed.connect(self.lookup)
+        self.input.textEdited.connect(self.debounce.start)
+
+    def closeEvent(self, event):
+        self.online.shutdown()  # 作废未返回的查询，排队中的不再执行，线程池不拖住进程退出
+        super().closeEvent(event)
+
+    def fetch_online(self, text):
+        """后台线程中执行：Google翻译（带缓存、限速和熔断）"""
+        return cached_translate("google", text, fetch_google)
 
     def lookup(self):
+        """回车/查询按钮：本地查不到时在线翻译"""
+        self.run_lookup(online=True)
+
+    def lookup_local(self):
+        """停止输入后的自动查词只查本地：半截单词不发到网上，也不写进翻译缓存"""
+        self.run_lookup(online=False)
+
+    def run_lookup(self, online):
+        self.debounce.stop()
+        self.online.cancel()  # 还没返回的上一次在线查询作废
         text = self.input.text().strip()
         self.webview.setVisible(False)
         if not text:
@@ -111,18 +119,29 @@ class NightDict(QMainWindow):
             self.output.setText(result)
             return
 
+        if not online:
+            self.output.setText("未找到本地词条（按回车或点击查询在线翻译）")
+            return
+        reason = offline_reason("google")
+        if reason:
+            # 离线模式或熔断中：不等超时，也不加载在线网页，直接给本地结果
+            self.output.setText(f"未找到本地词条（{reason}，未在线翻译）")
+            return
         self.output.setText("未找到本地词条，正在使用Google翻译...\n")
-        QApplication.processEvents()
-        try:
-            translation = self.translator.translate(text, src='en', dest='zh-cn').text
+        self.online.submit(text)
+
+    def show_online_result(self, text, translation, error):
+        if error is None:
             self.output.append(f"【Google翻译】\n{translation}")
-        except Exception as e:
-            self.output.append(f"【Google翻译失败】\n{e}")
-            self.output.append("已集成百度翻译网页，请在下方网页中查阅/复制结果。")
-            # 拼接百度翻译网页URL
-            url = f"https://fanyi.baidu.com/mtpe-individual/multimodal?aldtype=16047#en/zh/{urllib.parse.quote(text)}"
-            self.webview.load(url)
-            self.webview.setVisible(True)
+            return
+        self.output.append(f"【Google翻译失败】\n{error}")
+        if isinstance(error, TranslationUnavailable):
+            return  # 刚熔断就别再加载在线网页
+        self.output.append("已集成百度翻译网页，请在下方网页中查阅/复制结果。")
+        # 拼接百度翻译网页URL
+        url = f"https://fanyi.baidu.com/mtpe-individual/multimodal?aldtype=16047#en/zh/{urllib.parse.quote(text)}"
+        self.webview.load(url)
+        self.webview.setVisible(True)
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
@@ -0,0 +1,109 @@
+"""百度网页翻译：每次新建 Session（原来的做法）vs 共享连接池的 BaiduWebClient
+
+用法：python bench/bench_baidu_client.py [--calls 200] [--handshake-ms 30] [--latency-ms 5] [--threads 4]
+用本地 http.server 模拟百度网页（HTTP/1.1 长连接），不联网。本地没有真实的DNS/TLS握手，
+用 --handshake-ms 模拟：服务端每接受一个新连接先等这么久，复用的连接不再等。需要安装 requests。
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fanyi import BaiduWebClient
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # 支持 keep-alive
+    handshake = 0.03
+    latency = 0.005
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        cls = type(self)
+        cls.connections += 1
+        time.sleep(cls.handshake)   # 每个新连接付一次"握手"
+
+    def do_GET(self):
+        time.sleep(type(self).latency)
+        word = urllib.parse.unquote(self.path.rsplit("/", 1)[-1])
+        data = ('<html>...<script>window.g_result={"dst":"译%s"}</script>' % word).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def old_fetch(base_url, text):
+    """原 three.py 的写法：每次新建 Session，正则现编译"""
+    session = requests.Session()
+    html = session.get(base_url + requests.utils.quote(text), timeout=5, headers={"User-Agent": "Mozilla/5.0"}).text
+    m = re.search(r'"dst":"([^"]+)"', html)
+    return m.group(1) if m else None
+
+def run(fetch, words, threads):
+    times = []
+
+    def one(word):
+        t0 = time.perf_counter()
+        result = fetch(word)
+        times.append(time.perf_counter() - t0)
+        return result
+
+    t0 = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(one, words))
+    else:
+        results = [one(w) for w in words]
+    total = time.perf_counter() - t0
+    times.sort()
+    ok = sum(r == "译" + w for r, w in zip(results, words))
+    return total, statistics.median(times), times[int(len(times) * 0.99) - 1], ok
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="百度网页翻译连接池基准（本地模拟服务）")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=30)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    StandInHandler.handshake = args.handshake_ms / 1000
+    StandInHandler.latency = args.latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/en/zh/"  # 不带#，让路径里的词到达服务端
+    words = [f"word{i}" for i in range(args.calls)]
+    client = BaiduWebClient(base_url=base_url, pool_size=args.threads)
+
+    print(f"{args.calls} 次调用，模拟握手 {args.handshake_ms:.0f} ms，服务端处理 {args.latency_ms:.0f} ms")
+    print(f"{'方式':<24}{'总耗时秒':>10}{'p50 ms':>9}{'p99 ms':>9}{'新连接':>8}{'正确':>7}")
+    cases = [
+        ("每次新建Session 串行", lambda w: old_fetch(base_url, w), 1),
+        (f"每次新建Session {args.threads}线程", lambda w: old_fetch(base_url, w), args.threads),
+        ("连接池 串行", client.fetch, 1),
+        (f"连接池 {args.threads}线程", client.fetch, args.threads),
+    ]
+    for name, fetch, threads in cases:
+        StandInHandler.connections = 0
+        total, p50, p99, ok = run(fetch, words, threads)
+        print(f"{name:<24}{total:>10.2f}{p50 * 1000:>9.1f}{p99 * 1000:>9.1f}{StandInHandler.connections:>8}{ok:>7}")
+    client.close()
+    server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""核心热点路径微基准：与 bench/baseline.json 记录的基线比较，超出阈值即视为性能回退
+
+用法：
+    python bench/bench_core.py                   # 运行并与基线比较，有回退时退出码为1
+    python bench/bench_core.py --save-baseline   # 在当前机器上重新记录基线
+    python bench/bench_core.py --dict 路径/dict.txt --threshold 0.3
+
+只用标准库和本仓库的纯Python模块（不需要PyQt5/spaCy/NLTK，也不联网）。
+dict.txt 不存在时用 46merged.txt 代替（同为 "词头\\t释义" 格式）。编译产物写在临时目录，不污染工作区。
+基线与机器相关，换机器或换词典后先 --save-baseline 再比较。
+延迟分位数取 REPEAT 轮的中位数；p99 样本少、抖动大，只报告不参与回退判定（判定看 p50）。
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from cidian_index import (CompiledDict, compile_dict, compiled_path, inflections, open_dict, open_fuzzy,
+                          open_lemma_index, parse_dict_lines, resolve)
+from shuci_store import KnownWordStore, load_known_words
+from tiqu_core import count_lemmas, split_known_unknown
+
+BASELINE_FILE = os.path.join(ROOT, "bench", "baseline.json")
+DEFAULT_THRESHOLD = 0.25   # 比基线慢25%以上算回退
+ABS_SLACK = 0.005          # 绝对误差容忍（同单位），避免微秒级指标因抖动误报
+REPEAT = 5                 # 每项重复次数，取中位数
+N_TOKENS = 200000          # 词元过滤循环的词元数
+N_DOC_WORDS = 20000        # 熟词/生词拆分的不同单词数
+N_QUERIES = 3000           # 查词延迟的查询次数
+N_FUZZY_QUERIES = 300
+STOP_WORDS = {"the", "a", "an", "of", "to", "in", "and", "or", "is", "are", "be", "for", "on", "with",
+              "as", "by", "at", "it", "this", "that", "from", "was", "were", "not", "but"}
+
+def median_ms(fn, repeat=REPEAT):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000
+
+def peak_kb(fn):
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak / 1024
+
+def percentile(sorted_values, p):
+    i = min(len(sorted_values) - 1, max(0, round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[i]
+
+def latency_us(fn, args_list, repeat=REPEAT):
+    """逐次调用计时，返回 (p50, p99) 微秒；各跑 repeat 轮，分位数取各轮的中位数"""
+    p50s, p99s = [], []
+    for _ in range(repeat):
+        times = []
+        for args in args_list:
+            t0 = time.perf_counter()
+            fn(*args)
+            times.append(time.perf_counter() - t0)
+        times.sort()
+        p50s.append(percentile(times, 50))
+        p99s.append(percentile(times, 99))
+    return statistics.median(p50s) * 1e6, statistics.median(p99s) * 1e6
+
+# ========== 词元过滤循环用的替身（模拟 spaCy Token 的几个属性） ==========
+class StubToken:
+    __slots__ = ("text", "lemma_", "is_alpha", "is_ascii")
+
+    def __init__(self, text, lemma):
+        self.text = text
+        self.lemma_ = lemma
+        self.is_alpha = text.isalpha()
+        self.is_ascii = text.isascii()
+
+    def __len__(self):
+        return len(self.text)
+
+def make_tokens(words, rng, n):
+    """按真实文本的大致比例混合：词典词及其屈折形式、停用词、数字标点、非ASCII词"""
+    noise = ["2024", ",", ".", "(", "x", "naïve", "—", "3.14", "e.g"]
+    stops = sorted(STOP_WORDS)
+    tokens = []
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.55:
+            lemma = rng.choice(words)
+            forms = sorted(inflections(lemma)) if rng.random() < 0.3 else []
+            text = rng.choice(forms) if forms else lemma
+            tokens.append(StubToken(text.capitalize() if rng.random() < 0.1 else text, lemma))
+        elif r < 0.85:
+            w = rng.choice(stops)
+            tokens.append(StubToken(w, w))
+        else:
+            w = rng.choice(noise)
+            tokens.append(StubToken(w, w))
+    return tokens
+
+# ========== 各项基准 ==========
+def run_benchmarks(dict_src, known_files, work_dir):
+    rng = random.Random(0)
+    metrics = {}
+
+    def record(name, value, unit, gate=True):
+        metrics[name] = {"value": round(value, 4), "unit": unit}
+        if not gate:
+            metrics[name]["gate"] = False   # 只报告，不算回退
+        print(f"  {name:<32} {value:12.3f} {unit}")
+
+    dict_txt = os.path.join(work_dir, "dict.txt")
+    shutil.copy(dict_src, dict_txt)
+
+    print("词典：")
+    record("dict_parse_ms", median_ms(lambda: parse_dict_lines(dict_txt)), "ms")
+    record("dict_parse_peak_kb", peak_kb(lambda: parse_dict_lines(dict_txt)), "KB")
+    out_path = compiled_path(dict_txt)
+    record("dict_compile_ms", median_ms(lambda: compile_dict(dict_txt, out_path), repeat=3), "ms")
+    record("dict_open_ms", median_ms(lambda: CompiledDict(out_path).close(), repeat=50), "ms")
+    record("dict_open_peak_kb", peak_kb(lambda: CompiledDict(out_path)), "KB")
+
+    d = open_dict(dict_txt)
+    lemmas = open_lemma_index(dict_txt, d)
+    words = [w for w in d.keys() if w.isalpha()]
+
+    print("熟词库：")
+    for path in known_files:
+        name = os.path.splitext(os.path.basename(path))[0]
+        record(f"known_words_{name}_ms", median_ms(lambda: load_known_words(path)), "ms")
+    store = KnownWordStore(known_files[-1])
+    record("known_store_refresh_us", median_ms(store.refresh, repeat=1000) * 1000, "us")
+
+    print("提取：")
+    vocab = set(words)
+    tokens = make_tokens(words, rng, N_TOKENS)
+    record("token_filter_ms", median_ms(lambda: count_lemmas(tokens, vocab, STOP_WORDS, Counter())), "ms")
+
+    doc_words = rng.sample(words, min(N_DOC_WORDS, len(words)))
+    doc_words += [w + "zz" for w in doc_words[:N_DOC_WORDS // 10]]   # 一部分本地词典查不到
+    word_counter = Counter({w: rng.randint(1, 50) for w in doc_words})
+    known_sets = [load_known_words(path) for path in known_files]
+
+    def lookup(word):
+        _, definition = resolve(d, lemmas, word)
+        return definition or ""
+    record("split_known_unknown_ms",
+           median_ms(lambda: split_known_unknown(word_counter, known_sets, lookup), repeat=3), "ms")
+
+    print("查词：")
+    queries = []
+    for _ in range(N_QUERIES):
+        r = rng.random()
+        word = rng.choice(words)
+        if r < 0.6:
+            queries.append(word)
+        elif r < 0.85:
+            forms = sorted(inflections(word))
+            queries.append(rng.choice(forms) if forms else word)
+        else:
+            queries.append(word[:-1] + "q" if len(word) > 3 else word + "q")
+    d.get(queries[0])  # 预热：首次访问 mmap 的缺页开销不计入延迟
+    p50, p99 = latency_us(lambda q: resolve(d, lemmas, q), [(q,) for q in queries])
+    record("lookup_p50_us", p50, "us")
+    record("lookup_p99_us", p99, "us", gate=False)
+    p50, p99 = latency_us(lambda q: d.prefix_search(q, 12), [(q[:3],) for q in queries])
+    record("prefix_search_p50_us", p50, "us")
+    record("prefix_search_p99_us", p99, "us", gate=False)
+    fuzzy = open_fuzzy(dict_txt, d)
+    misses = [(q,) for q in queries if resolve(d, lemmas, q)[1] is None][:N_FUZZY_QUERIES]
+    if misses:
+        p50, p99 = latency_us(lambda q: fuzzy.suggest(q, 5), misses)
+        record("fuzzy_suggest_p50_us", p50, "us")
+        record("fuzzy_suggest_p99_us", p99, "us", gate=False)
+    fuzzy.close()
+    lemmas.close()
+    d.close()
+    return metrics
+
+# ========== 基线 ==========
+def machine_info(dict_src):
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "dict": os.path.basename(dict_src),
+        "dict_size": os.path.getsize(dict_src),
+    }
+
+def compare(metrics, baseline, threshold):
+    """返回回退的指标名列表"""
+    regressions = []
+    print(f"\n与基线比较（阈值 +{threshold:.0%}）：")
+    for name, m in metrics.items():
+        base = baseline["metrics"].get(name)
+        if base is None:
+            print(f"  {name:<32} 无基线")
+            continue
+        value, ref = m["value"], base["value"]
+        change = (value - ref) / ref if ref else 0.0
+        gated = m.get("gate", True)
+        bad = gated and value > ref * (1 + threshold) + ABS_SLACK
+        flag = "❌ 回退" if bad else ("✅" if gated else "（仅报告）")
+        print(f"  {name:<32} {ref:12.3f} -> {value:12.3f} {m['unit']:<3} {change:+7.1%} {flag}")
+        if bad:
+            regressions.append(name)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="核心热点路径微基准")
+    parser.add_argument("--dict", default=os.path.join(ROOT, "dict.txt"), help="词典文件（默认 dict.txt，没有则用 46merged.txt）")
+    parser.add_argument("--known", nargs="+",
+                        default=[os.path.join(ROOT, "46merged.txt"), os.path.join(ROOT, "shuci02.txt")],
+                        help="熟词库文件")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="基线文件")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="允许比基线慢的比例")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果写为新基线")
+    args = parser.parse_args(argv)
+
+    dict_src = args.dict if os.path.exists(args.dict) else os.path.join(ROOT, "46merged.txt")
+    print(f"词典：{dict_src}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        metrics = run_benchmarks(dict_src, args.known, work_dir)
+    info = machine_info(dict_src)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"machine": info, "metrics": metrics}, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"\n已写入基线：{args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\n没有基线文件 {args.baseline}，先用 --save-baseline 记录一次")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("machine", {}).get("dict") != info["dict"]:
+        print(f"⚠️ 基线用的词典是 {baseline.get('machine', {}).get('dict')}，本次是 {info['dict']}，结果不可比")
+    regressions = compare(metrics, baseline, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} 项性能回退：{', '.join(regressions)}")
+        return 1
+    print("\n✅ 没有性能回退")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
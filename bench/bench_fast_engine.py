@@ -0,0 +1,93 @@
+"""快速统计引擎与 spaCy 引擎的速度和准确度对比
+
+用法：python bench/bench_fast_engine.py 书1.pdf [书2.pdf ...] [--pages 1-50] [--backend pypdfium2]
+两个引擎用同一份抽出的文本；只计统计本身的耗时，不含抽取文本和加载模型。
+频次一致度 = 两边Counter交集次数 / 并集次数；单词一致度 = 两边单词集合的 Jaccard。
+需要 spaCy 和 NLTK 词表（只测快速引擎时加 --fast-only）。
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tiqu_backends import BACKENDS, DEFAULT_BACKEND, open_text_doc
+from tiqu_core import count_texts
+from tiqu_fast import TOKEN_RE
+from ziyuan import get_extract_resources, get_fast_resources
+
+def read_pages(pdf_path, backend, page_range):
+    with open_text_doc(pdf_path, backend) as pdf:
+        start, end = page_range or (1, pdf.page_count)
+        return [t for t in (pdf.page_text(n) for n in range(start, min(end, pdf.page_count) + 1)) if t]
+
+def run_spacy(texts):
+    nlp, vocab, stops = get_extract_resources()
+    t0 = time.perf_counter()
+    counter = count_texts(nlp, texts, vocab, stops)
+    return counter, time.perf_counter() - t0
+
+def run_fast(texts):
+    engine, _, _ = get_fast_resources()
+    t0 = time.perf_counter()
+    counter = Counter()
+    for text in texts:
+        engine.count_text(text, counter)
+    return counter, time.perf_counter() - t0
+
+def overlap(a, b):
+    union = sum((a | b).values())
+    return sum((a & b).values()) / union if union else 1.0
+
+def jaccard(a, b):
+    union = len(a.keys() | b.keys())
+    return len(a.keys() & b.keys()) / union if union else 1.0
+
+def parse_pages(text):
+    start, _, end = text.partition("-")
+    return int(start), int(end or start)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="快速统计引擎 vs spaCy")
+    parser.add_argument("pdfs", nargs="+")
+    parser.add_argument("--pages", type=parse_pages, help="只用这些页，如 1-50")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, choices=list(BACKENDS))
+    parser.add_argument("--fast-only", action="store_true", help="不跑spaCy，只测快速引擎速度")
+    parser.add_argument("--top", type=int, default=15, help="列出频次差异最大的单词个数")
+    args = parser.parse_args(argv)
+
+    # 先各跑一次空文本，把模型/词表/查表的加载时间排除在外
+    run_fast([""])
+    if not args.fast_only:
+        run_spacy([""])
+
+    print(f"{'文件':<28}{'词元':>9}{'fast 词元/秒':>14}{'spaCy 词元/秒':>15}{'提速':>7}{'频次一致':>9}{'单词一致':>9}")
+    total_fast, total_spacy = Counter(), Counter()
+    for path in args.pdfs:
+        texts = read_pages(path, args.backend, args.pages)
+        n_tokens = sum(len(TOKEN_RE.findall(t)) for t in texts)
+        fast, fast_sec = run_fast(texts)
+        total_fast.update(fast)
+        name = os.path.basename(path)[:26]
+        if args.fast_only:
+            print(f"{name:<28}{n_tokens:>9}{n_tokens / fast_sec:>14.0f}")
+            continue
+        ref, spacy_sec = run_spacy(texts)
+        total_spacy.update(ref)
+        print(f"{name:<28}{n_tokens:>9}{n_tokens / fast_sec:>14.0f}{n_tokens / spacy_sec:>15.0f}"
+              f"{spacy_sec / fast_sec:>6.1f}x{overlap(fast, ref):>9.1%}{jaccard(fast, ref):>9.1%}")
+
+    if args.fast_only:
+        return 0
+    print(f"\n合计：频次一致 {overlap(total_fast, total_spacy):.1%}，单词一致 {jaccard(total_fast, total_spacy):.1%}")
+    diffs = sorted(total_fast.keys() | total_spacy.keys(),
+                   key=lambda w: -abs(total_fast[w] - total_spacy[w]))[:args.top]
+    print(f"\n差异最大的 {len(diffs)} 个单词（fast / spaCy）：")
+    for word in diffs:
+        print(f"  {word:<20}{total_fast[word]:>7}{total_spacy[word]:>7}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""对比：完整流水线逐页 nlp(text) vs 精简流水线 nlp.pipe 批处理 的页/秒
+
+用法：python bench/bench_nlp_pipe.py 书.pdf 起始页 结束页 [batch_size] [n_process]
+PDF文本只抽取一次，计时只包含spaCy部分。
+"""
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdfplumber
+import spacy
+from nltk.corpus import words as nltk_words
+from nltk.corpus import stopwords
+
+from tiqu_core import PIPE_BATCH_SIZE, count_lemmas, count_texts, load_count_nlp
+
+def main(argv):
+    if len(argv) < 4:
+        print(__doc__)
+        return 1
+    pdf_path, start_page, end_page = argv[1], int(argv[2]), int(argv[3])
+    batch_size = int(argv[4]) if len(argv) > 4 else PIPE_BATCH_SIZE
+    n_process = int(argv[5]) if len(argv) > 5 else 1
+
+    english_vocab = set(w.lower() for w in nltk_words.words())
+    stop_words = set(stopwords.words('english'))
+    with pdfplumber.open(pdf_path) as pdf:
+        texts = [p.extract_text() or "" for p in pdf.pages[start_page - 1 : end_page]]
+    n_pages = len(texts)
+
+    full_nlp = spacy.load("en_core_web_sm")
+    t0 = time.perf_counter()
+    old_counter = Counter()
+    for text in texts:
+        if text:
+            count_lemmas(full_nlp(text), english_vocab, stop_words, old_counter)
+    old_sec = time.perf_counter() - t0
+
+    count_nlp = load_count_nlp()
+    t0 = time.perf_counter()
+    new_counter = count_texts(count_nlp, [t for t in texts if t], english_vocab, stop_words,
+                              batch_size=batch_size, n_process=n_process)
+    new_sec = time.perf_counter() - t0
+
+    print(f"页数：{n_pages}")
+    print(f"逐页 nlp()（完整流水线 {full_nlp.pipe_names}）：{n_pages / old_sec:8.1f} 页/秒")
+    print(f"nlp.pipe（{count_nlp.pipe_names}, batch={batch_size}, n_process={n_process}）："
+          f"{n_pages / new_sec:8.1f} 页/秒")
+    print(f"提速：{old_sec / new_sec:.2f}x")
+    diff = (old_counter - new_counter) + (new_counter - old_counter)
+    print(f"词频差异：{sum(diff.values())} 次 / 共 {sum(old_counter.values())} 次")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,70 @@
+"""对比各PDF文本后端在同一文档上的抽取速度，以及抽出的单词与 pdfplumber 的一致程度
+
+用法：python bench/bench_pdf_backends.py 书.pdf [起始页 结束页] [后端 ...]
+未安装依赖的后端自动跳过。一致度 = 两边字母单词Counter的交集次数 / 并集次数。
+"""
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tiqu_backends import BACKENDS, DEFAULT_BACKEND, available_backends, open_text_doc
+
+WORD_RE = re.compile(r"[A-Za-z]{2,}")
+
+def run_backend(name, pdf_path, start_page, end_page):
+    t0 = time.perf_counter()
+    words = Counter()
+    chars = 0
+    with open_text_doc(pdf_path, name) as pdf:
+        t_open = time.perf_counter() - t0
+        end_page = min(end_page, pdf.page_count)
+        for n in range(start_page, end_page + 1):
+            text = pdf.page_text(n)
+            chars += len(text)
+            words.update(w.lower() for w in WORD_RE.findall(text))
+    sec = time.perf_counter() - t0
+    return end_page - start_page + 1, sec, t_open, chars, words
+
+def overlap(a, b):
+    union = sum((a | b).values())
+    return sum((a & b).values()) / union if union else 1.0
+
+def main(argv):
+    if len(argv) < 2:
+        print(__doc__)
+        return 1
+    pdf_path = argv[1]
+    pages = [int(a) for a in argv[2:] if a.isdigit()]
+    start_page, end_page = (pages + [1, 10 ** 9])[:2] if len(pages) != 1 else (pages[0], pages[0])
+    names = [a for a in argv[2:] if not a.isdigit()] or list(BACKENDS)
+    available = set(available_backends())
+
+    results = {}
+    for name in names:
+        if name not in BACKENDS:
+            print(f"{name:<18} 未知后端（可选：{', '.join(BACKENDS)}）")
+            continue
+        if name not in available:
+            print(f"{name:<18} 跳过（需要安装 {BACKENDS[name][1]}）")
+            continue
+        results[name] = run_backend(name, pdf_path, start_page, end_page)
+
+    ref = results.get(DEFAULT_BACKEND)
+    print(f"\n{'后端':<18}{'页数':>6}{'页/秒':>10}{'打开ms':>9}{'字符数':>10}{'单词数':>9}{'与pdfplumber一致':>16}")
+    for name, (n_pages, sec, t_open, chars, words) in results.items():
+        agree = f"{overlap(words, ref[4]):.1%}" if ref is not None else "-"
+        print(f"{name:<18}{n_pages:>6}{n_pages / sec:>10.1f}{t_open * 1000:>9.1f}{chars:>10}"
+              f"{sum(words.values()):>9}{agree:>16}")
+    if ref is not None:
+        base = ref[0] / ref[1]
+        for name, (n_pages, sec, *_) in results.items():
+            if name != DEFAULT_BACKEND:
+                print(f"{name} 相对 pdfplumber 提速：{n_pages / sec / base:.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,99 @@
+"""批量翻译 vs 逐词翻译：用本地 http.server 模拟翻译服务（固定往返延迟），不联网
+
+用法：python bench/bench_translate_batch.py [--words 500] [--latency-ms 80] [--concurrency 4] [--misalign 0.05]
+模拟服务把每行 "word" 译成 "译word"；--misalign 为每个多行请求返回错行（少一行）的概率，用来测逐词回退。
+每种方式用各自的空缓存，只比较网络请求的开销。
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fanyi import RATE_LIMITS, TRANSLATION_FAILED, TranslationCache, translate_many
+
+class StandInHandler(BaseHTTPRequestHandler):
+    latency = 0.08
+    misalign = 0.0
+    rng = random.Random(0)
+    requests = 0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        text = urllib.parse.parse_qs(body.decode("utf-8"))["q"][0]
+        cls = type(self)
+        cls.requests += 1
+        time.sleep(cls.latency)
+        lines = ["译" + line for line in text.split("\n")]
+        if len(lines) > 1 and cls.rng.random() < cls.misalign:
+            lines.pop()
+        data = "\n".join(lines).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def make_fetch(url):
+    def fetch(text):
+        data = urllib.parse.urlencode({"q": text}).encode("utf-8")
+        with urllib.request.urlopen(url, data=data, timeout=10) as resp:
+            return resp.read().decode("utf-8")
+    return fetch
+
+def fetch_each(fetch, words, executor):
+    """逐词请求（原来的做法）"""
+    return dict(zip(words, executor.map(fetch, words) if executor else map(fetch, words)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量翻译基准（本地模拟服务）")
+    parser.add_argument("--words", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--misalign", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    RATE_LIMITS["bench"] = (1e6, 1000)  # 只比较批量与逐词，不让限速器参与
+    StandInHandler.latency = args.latency_ms / 1000
+    StandInHandler.misalign = args.misalign
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    fetch = make_fetch(f"http://127.0.0.1:{server.server_address[1]}/translate")
+    words = [f"word{i}" for i in range(args.words)]
+
+    print(f"{args.words} 个词，模拟往返延迟 {args.latency_ms:.0f} ms，批内错行概率 {args.misalign:.0%}")
+    print(f"{'方式':<22}{'耗时秒':>9}{'请求数':>8}{'词/秒':>9}{'正确':>7}")
+    with tempfile.TemporaryDirectory() as tmp, ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        cases = [
+            ("逐词 串行", lambda: fetch_each(fetch, words, None)),
+            (f"逐词 并发{args.concurrency}", lambda: fetch_each(fetch, words, pool)),
+            ("批量 串行", lambda: translate_many("bench", words, fetch,
+                                              cache=TranslationCache(os.path.join(tmp, "serial.db")))),
+            (f"批量 并发{args.concurrency}", lambda: translate_many("bench", words, fetch, executor=pool,
+                                                      cache=TranslationCache(os.path.join(tmp, "pool.db")))),
+        ]
+        for name, run in cases:
+            StandInHandler.requests = 0
+            t0 = time.perf_counter()
+            results = run()
+            sec = time.perf_counter() - t0
+            correct = sum(results.get(w) == "译" + w for w in words)
+            failed = sum(results.get(w) == TRANSLATION_FAILED for w in words)
+            note = f"  失败 {failed}" if failed else ""
+            print(f"{name:<22}{sec:>9.2f}{StandInHandler.requests:>8}{len(words) / sec:>9.0f}{correct:>7}{note}")
+    server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
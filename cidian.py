@@ -5,29 +5,14 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtGui import QPalette, QColor, QFont
 from PyQt5.QtCore import Qt
-
-def load_dict(file):
-    d_en2zh = {}
-    with open(file, encoding='utf-8') as f:
-        for idx, line in enumerate(f, 1):
-            line = line.strip()
-            if not line:
-                continue
-            parts = line.split('\t', 1)
-            if len(parts) != 2:
-                continue
-            en, zh = parts
-            en, zh = en.strip(), zh.strip()
-            if en and zh:
-                d_en2zh[en.lower()] = zh
-    return d_en2zh
+from cidian_index import open_dict
 
 class NightDict(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle('离线英译中词典')
         self.resize(520, 240)
-        self.dict_en2zh = load_dict('dict.txt')
+        self.dict_en2zh = open_dict('dict.txt')
 
         # 美观字体
         font = QFont('微软雅黑', 12)
@@ -0,0 +1,514 @@
+"""编译版英汉词典：dict.txt 一次编译成二进制索引，启动时 mmap 打开，二分查找
+
+文件布局（小端）：
+    头部      magic, 格式版本, 词条数, 每块词条数, 各段偏移
+    词头偏移表  (n+1) 个 uint32，指向词头区
+    词头区      按UTF-8字节序排好的小写词头，直接拼接
+    块偏移表    (块数+1) 个 uint64，指向释义区
+    释义区      每块若干条释义用换行拼接后 zlib 压缩
+
+词形还原索引（*.lemma.cidx）沿用同一格式：键为词典中没有的屈折形式，值为词典里的原形词头。
+
+模糊查词索引（*.fuzzy.cidx）沿用同一格式：键为词头前缀删去至多2个字母后的串，
+值为空格拼接的原词头（SymSpell 对称删除法），查询时对输入做同样的删除再逐个二分查找。
+
+用法：python cidian_index.py dict.txt [dict.cidx]
+同时构建词形还原索引和模糊索引（写在 dict.txt 旁边）；词典更新后重新运行一次，查词界面不会自己构建这两个索引。
+"""
+import heapq
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from array import array
+from functools import lru_cache
+from itertools import groupby
+
+MAGIC = b"CDIX"
+FORMAT_VERSION = 1
+BLOCK_ENTRIES = 64          # 每个压缩块的词条数：越大压缩率越高，单次查词解压越多
+BLOCK_CACHE_SIZE = 256      # 最近解压过的块缓存个数
+COMPILED_SUFFIX = ".cidx"
+FUZZY_SUFFIX = ".fuzzy.cidx"
+LEMMA_SUFFIX = ".lemma.cidx"
+STALE_TMP_AGE = 3600        # 替换失败留下的临时文件超过这么久（秒）才清理
+FUZZY_MAX_DISTANCE = 2      # 最大编辑距离
+FUZZY_PREFIX_LENGTH = 7     # 只对词头前7个字母做删除，索引体积与查询耗时都可控
+FUZZY_SORT_CHUNK = 500000   # 构建模糊索引时每块在内存里排序的 (删除串, 词头) 对数
+
+_HEADER = struct.Struct("<4sIIIQQQQ")
+
+def parse_dict_lines(file):
+    """按原 load_dict 的规则解析 tab 分隔词典，返回 {小写词头: 释义}"""
+    d_en2zh = {}
+    with open(file, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split('\t', 1)
+            if len(parts) != 2:
+                continue
+            en, zh = parts
+            en, zh = en.strip(), zh.strip()
+            if en and zh:
+                d_en2zh[en.lower()] = zh
+    return d_en2zh
+
+def write_compiled(pairs, out_path, block_entries=BLOCK_ENTRIES):
+    """把 {词头: 释义} 写成编译格式（先写临时文件再替换，避免留下半个文件）"""
+    items = sorted(((k.encode("utf-8"), v) for k, v in pairs.items()), key=lambda kv: kv[0])
+    return write_compiled_sorted(items, out_path, block_entries)
+
+def write_compiled_sorted(items, out_path, block_entries=BLOCK_ENTRIES):
+    """items 为按UTF-8字节序排好、词头不重复的 (词头bytes, 释义)，边读边写
+
+    词头区和释义区先流式写进两个临时文件，内存里只留偏移表，最后按文件布局拼起来。
+    """
+    tmp_dir = os.path.dirname(out_path) or "."
+    key_offsets = array("I", [0])
+    block_offsets = array("Q", [0])
+    with tempfile.TemporaryFile(dir=tmp_dir) as key_f, tempfile.TemporaryFile(dir=tmp_dir) as block_f:
+        values = []
+
+        def flush_block():
+            block = zlib.compress("\n".join(values).encode("utf-8"), 6)
+            block_f.write(block)
+            block_offsets.append(block_offsets[-1] + len(block))
+            values.clear()
+
+        for key, value in items:
+            key_f.write(key)
+            key_offsets.append(key_offsets[-1] + len(key))
+            values.append(value.replace("\n", " "))
+            if len(values) == block_entries:
+                flush_block()
+        if values:
+            flush_block()
+        n = len(key_offsets) - 1
+        if sys.byteorder != "little":
+            key_offsets.byteswap()
+            block_offsets.byteswap()
+
+        key_idx_off = _HEADER.size
+        key_blob_off = key_idx_off + 4 * (n + 1)
+        block_idx_off = key_blob_off + key_f.tell()
+        block_blob_off = block_idx_off + 8 * len(block_offsets)
+
+        # 临时文件名唯一：多个实例同时编译不会互相覆盖
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, prefix=os.path.basename(out_path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, n, block_entries,
+                                     key_idx_off, key_blob_off, block_idx_off, block_blob_off))
+                f.write(key_offsets.tobytes())
+                key_f.seek(0)
+                shutil.copyfileobj(key_f, f)
+                f.write(block_offsets.tobytes())
+                block_f.seek(0)
+                shutil.copyfileobj(block_f, f)
+            os.chmod(tmp_path, 0o644)  # mkstemp 建的文件只有自己可读，换成普通文件的权限
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    _install(tmp_path, out_path)
+    return n
+
+_fallback_paths = {}   # 目标文件 -> 本进程新写好、但没能替换过去的临时文件
+
+def _install(tmp_path, out_path):
+    """临时文件替换成目标文件；目标被别的实例 mmap 着（Windows 上替换会失败）时，本进程改用临时文件"""
+    try:
+        os.replace(tmp_path, out_path)
+    except OSError:
+        _fallback_paths[out_path] = tmp_path
+        return
+    _fallback_paths.pop(out_path, None)
+    # 顺手清掉以前替换失败留下的临时文件；只删早就写完的，别的实例正在写的不碰，还开着的删不掉就下次再清
+    prefix, folder = os.path.basename(out_path) + ".", os.path.dirname(out_path) or "."
+    expired = time.time() - STALE_TMP_AGE
+    for name in os.listdir(folder):
+        if name.startswith(prefix) and name.endswith(".tmp"):
+            path = os.path.join(folder, name)
+            try:
+                if os.path.getmtime(path) < expired:
+                    os.remove(path)
+            except OSError:
+                pass
+
+def installed_path(out_path):
+    """out_path 实际该打开的文件：本进程编译后没能替换过去时是那个新写的临时文件"""
+    return _fallback_paths.get(out_path, out_path)
+
+def compiled_path(txt_path):
+    return os.path.splitext(txt_path)[0] + COMPILED_SUFFIX
+
+def compile_dict(txt_path, out_path=None):
+    """编译 dict.txt，返回写入的词条数"""
+    return write_compiled(parse_dict_lines(txt_path), out_path or compiled_path(txt_path))
+
+class CompiledDict:
+    """只读词典，用法同 dict：get / in / len；释义按块懒解压"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            raise ValueError(f"{path} 是空文件")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self._n, self._block_entries,
+         self._key_idx_off, self._key_blob_off,
+         self._block_idx_off, self._block_blob_off) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} 不是可识别的编译词典")
+        self._block = lru_cache(maxsize=BLOCK_CACHE_SIZE)(self._read_block)
+
+    def __len__(self):
+        return self._n
+
+    def _key_at(self, i):
+        start, end = struct.unpack_from("<II", self._mm, self._key_idx_off + 4 * i)
+        return self._mm[self._key_blob_off + start : self._key_blob_off + end]
+
+    def _bisect(self, key):
+        """返回第一个 >= key 的下标"""
+        lo, hi = 0, self._n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _read_block(self, b):
+        start, end = struct.unpack_from("<QQ", self._mm, self._block_idx_off + 8 * b)
+        data = self._mm[self._block_blob_off + start : self._block_blob_off + end]
+        return zlib.decompress(data).decode("utf-8").split("\n")
+
+    def _value_at(self, i):
+        b, j = divmod(i, self._block_entries)
+        return self._block(b)[j]
+
+    def index_of(self, word):
+        """词头下标，不存在返回 -1"""
+        key = word.encode("utf-8")
+        i = self._bisect(key)
+        if i < self._n and self._key_at(i) == key:
+            return i
+        return -1
+
+    def prefix_search(self, prefix, k=10):
+        """以 prefix 开头的前k个词头（字典序）；二分定位后顺序读，不扫描全表"""
+        key = prefix.encode("utf-8")
+        words = []
+        i = self._bisect(key)
+        while i < self._n and len(words) < k:
+            word = self._key_at(i)
+            if not word.startswith(key):
+                break
+            words.append(word.decode("utf-8"))
+            i += 1
+        return words
+
+    def get(self, word, default=None):
+        i = self.index_of(word)
+        return self._value_at(i) if i >= 0 else default
+
+    def __getitem__(self, word):
+        i = self.index_of(word)
+        if i < 0:
+            raise KeyError(word)
+        return self._value_at(i)
+
+    def __contains__(self, word):
+        return self.index_of(word) >= 0
+
+    def keys(self):
+        for i in range(self._n):
+            yield self._key_at(i).decode("utf-8")
+
+    __iter__ = keys
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+def open_dict(txt_path):
+    """打开词典：编译文件不存在或比 dict.txt 旧时先编译，然后 mmap 打开"""
+    out_path = compiled_path(txt_path)
+    if os.path.exists(txt_path):
+        if not os.path.exists(out_path) or os.path.getmtime(out_path) < os.path.getmtime(txt_path):
+            compile_dict(txt_path, out_path)
+    elif not os.path.exists(out_path):
+        raise FileNotFoundError(txt_path)
+    return CompiledDict(installed_path(out_path))
+
+# ========== 屈折形式 -> 原形 ==========
+_VOWELS = set("aeiou")
+
+def _is_cvc(word):
+    """辅音+元音+辅音结尾（且末字母不是 w/x/y），加词尾时要双写末字母，如 cut -> cutting"""
+    return (len(word) >= 3 and word[-1] not in _VOWELS and word[-1] not in "wxy"
+            and word[-2] in _VOWELS and word[-3] not in _VOWELS)
+
+def inflections(word):
+    """按英语构词规则生成可能的屈折形式（复数/三单、过去式、-ing、比较级），宁多勿漏"""
+    forms = set()
+    consonant_y = word.endswith("y") and len(word) > 1 and word[-2] not in _VOWELS
+    if word.endswith(("s", "x", "z", "ch", "sh")):
+        forms.add(word + "es")
+    elif consonant_y:
+        forms.add(word[:-1] + "ies")
+    else:
+        forms.add(word + "s")
+    if word.endswith("e"):
+        forms.update((word + "d", word + "r", word + "st"))
+    elif consonant_y:
+        forms.update((word[:-1] + "ied", word[:-1] + "ier", word[:-1] + "iest"))
+    else:
+        forms.update((word + "ed", word + "er", word + "est"))
+    if word.endswith("ie"):
+        forms.add(word[:-2] + "ying")
+    elif word.endswith("e") and not word.endswith(("ee", "ye", "oe")):
+        forms.add(word[:-1] + "ing")
+    else:
+        forms.add(word + "ing")
+    if _is_cvc(word):
+        last = word[-1]
+        forms.update(word + last + suffix for suffix in ("ed", "ing", "er", "est"))
+    forms.discard(word)
+    return forms
+
+def _wordnet_exceptions():
+    """NLTK WordNet 不规则变化表（went -> go, mice -> mouse），未安装时返回空"""
+    try:
+        from nltk.corpus import wordnet
+        wordnet.ensure_loaded()
+        pairs = []
+        for exc in wordnet._exception_map.values():
+            for form, lemmas in exc.items():
+                for lemma in lemmas:
+                    pairs.append((form, lemma))
+        return pairs
+    except (ImportError, LookupError, AttributeError):
+        return []
+
+def _spacy_lookup_table():
+    """spacy-lookups-data 自带的英文词形查表，未安装时返回空"""
+    try:
+        import json
+        import spacy_lookups_data
+        path = os.path.join(os.path.dirname(spacy_lookups_data.__file__), "data", "en_lemma_lookup.json")
+        with open(path, encoding="utf-8") as f:
+            return list(json.load(f).items())
+    except (ImportError, OSError, ValueError):
+        return []
+
+def irregular_lemma_pairs():
+    """不规则/查表得到的 (屈折形式, 原形)，均已小写；WordNet 例外表在前"""
+    pairs = []
+    for form, lemma in _wordnet_exceptions() + _spacy_lookup_table():
+        form, lemma = form.lower().replace("_", " "), lemma.lower().replace("_", " ")
+        if form != lemma:
+            pairs.append((form, lemma))
+    return pairs
+
+def _prefer_e_lemma(form, lemma, word):
+    """同一屈折形式由 lemma 和 lemma+"e" 两个词头推出时，是否改取后者 word
+
+    united 既可以是 unit+ed 也可以是 unite+d：过去式取带 e 的（hoped -> hope, singed -> singe）；
+    lemma 是辅音+元音+辅音结尾、本该双写末字母的，其他词尾也取带 e 的（hoping -> hope, cuter -> cute）。
+    """
+    return word == lemma + "e" and (form.endswith("ed") or _is_cvc(lemma))
+
+def compile_lemma_index(compiled_dict, out_path):
+    """屈折形式 -> 词典原形，只收录词典里本身没有的形式；查表数据优先于规则推导
+
+    规则推导只用3个字母以上的词头：he、be 这类短词推出的 hes、bes 多半不是真词。
+    """
+    forms = {}
+    for form, lemma in irregular_lemma_pairs():
+        if form not in forms and lemma in compiled_dict and form not in compiled_dict:
+            forms[form] = lemma
+    derived = {}
+    for word in compiled_dict.keys():
+        if not (word.isascii() and word.isalpha() and len(word) > 2):
+            continue
+        for form in inflections(word):
+            if form in forms or form in compiled_dict:
+                continue
+            lemma = derived.get(form)
+            if lemma is None or _prefer_e_lemma(form, lemma, word):
+                derived[form] = word
+    forms.update(derived)
+    write_compiled(forms, out_path)
+    return len(forms)
+
+def lemma_path(txt_path):
+    return os.path.splitext(txt_path)[0] + LEMMA_SUFFIX
+
+def open_lemma_index(txt_path, compiled_dict=None, build=True):
+    """打开词形还原索引：不存在或比编译词典旧时先构建，之后 mmap 打开；build=False 时不构建，直接返回 None
+
+    界面程序用 build=False，和模糊索引一样由 python cidian_index.py dict.txt 事先建好。
+    """
+    out_path = lemma_path(txt_path)
+    if compiled_dict is None:
+        compiled_dict = open_dict(txt_path)
+    if not os.path.exists(out_path) or os.path.getmtime(out_path) < os.path.getmtime(compiled_dict.path):
+        if not build:
+            return None
+        compile_lemma_index(compiled_dict, out_path)
+    return CompiledDict(installed_path(out_path))
+
+def resolve(compiled_dict, lemma_index, word):
+    """查词：先查原词，查不到再按屈折形式还原后查；返回 (词头, 释义)，都没有返回 (None, None)"""
+    word = word.strip().lower()
+    definition = compiled_dict.get(word)
+    if definition is not None:
+        return word, definition
+    if lemma_index is not None:
+        lemma = lemma_index.get(word)
+        if lemma is not None:
+            definition = compiled_dict.get(lemma)
+            if definition is not None:
+                return lemma, definition
+    return None, None
+
+# ========== 模糊查词（did you mean） ==========
+def _deletes(word, max_distance=FUZZY_MAX_DISTANCE):
+    """word 删除至多 max_distance 个字母得到的所有串（含自身）"""
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        nxt = set()
+        for w in frontier:
+            for i in range(len(w)):
+                nxt.add(w[:i] + w[i + 1:])
+        nxt -= result
+        result |= nxt
+        frontier = nxt
+    return result
+
+def edit_distance(a, b, max_distance=FUZZY_MAX_DISTANCE):
+    """相邻换位也算一步的编辑距离；超过 max_distance 时提前返回 max_distance+1"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > max_distance:
+            return max_distance + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+def _fuzzy_candidate(word):
+    return len(word) > 1 and word.isascii() and word.isalpha()
+
+def _spill_sorted(lines, tmp_dir):
+    """一块 "删除串\t词头\n" 排好序写进临时文件，返回从头读的文件对象"""
+    lines.sort()
+    f = tempfile.TemporaryFile(dir=tmp_dir)
+    f.write("".join(lines).encode("ascii"))
+    f.seek(0)
+    return f
+
+def _merge_deletes(runs):
+    """多路归并各块，同一删除串的词头拼成一条，产出 (删除串bytes, 空格拼接的词头)"""
+    for key, group in groupby(heapq.merge(*runs), key=lambda line: line[:line.index(b"\t")]):
+        yield key, " ".join(line[len(key) + 1:-1].decode("ascii") for line in group)
+
+def compile_fuzzy(words, out_path):
+    """为单词型词头（纯字母，不含短语）建删除索引，返回收录的词数
+
+    (删除串, 词头) 对每 FUZZY_SORT_CHUNK 条排序落盘一次，再多路归并流式写出，
+    内存占用只和块大小有关，不随词典变大。
+    """
+    tmp_dir = os.path.dirname(out_path) or "."
+    runs = []
+    lines = []
+    n = 0
+    try:
+        for word in words:
+            if not _fuzzy_candidate(word):
+                continue
+            n += 1
+            lines.extend(f"{d}\t{word}\n" for d in _deletes(word[:FUZZY_PREFIX_LENGTH]))
+            if len(lines) >= FUZZY_SORT_CHUNK:
+                runs.append(_spill_sorted(lines, tmp_dir))
+                lines = []
+        if lines:
+            runs.append(_spill_sorted(lines, tmp_dir))
+        write_compiled_sorted(_merge_deletes(runs), out_path)
+    finally:
+        for f in runs:
+            f.close()
+    return n
+
+class FuzzyIndex:
+    """编辑距离1~2的近似词头查询，索引同样 mmap 打开"""
+
+    def __init__(self, path):
+        self._deletes_dict = CompiledDict(path)
+
+    def suggest(self, word, k=5, max_distance=FUZZY_MAX_DISTANCE):
+        """返回 [(编辑距离, 词头)]，按距离、长度差、字典序排序，最多k个"""
+        word = word.strip().lower()
+        if not _fuzzy_candidate(word):
+            return []
+        candidates = set()
+        for d in _deletes(word[:FUZZY_PREFIX_LENGTH], max_distance):
+            hit = self._deletes_dict.get(d)
+            if hit:
+                candidates.update(hit.split(" "))
+        scored = []
+        for cand in candidates:
+            dist = edit_distance(word, cand, max_distance)
+            if 0 < dist <= max_distance:
+                scored.append((dist, abs(len(cand) - len(word)), cand))
+        scored.sort()
+        return [(dist, cand) for dist, _, cand in scored[:k]]
+
+    def close(self):
+        self._deletes_dict.close()
+
+def fuzzy_path(txt_path):
+    return os.path.splitext(txt_path)[0] + FUZZY_SUFFIX
+
+def open_fuzzy(txt_path, compiled_dict=None, build=True):
+    """打开模糊索引：不存在或比编译词典旧时先构建（较慢）；build=False 时不构建，直接返回 None
+
+    界面程序用 build=False，索引由 python cidian_index.py dict.txt 事先建好。
+    """
+    out_path = fuzzy_path(txt_path)
+    if compiled_dict is None:
+        compiled_dict = open_dict(txt_path)
+    if not os.path.exists(out_path) or os.path.getmtime(out_path) < os.path.getmtime(compiled_dict.path):
+        if not build:
+            return None
+        compile_fuzzy(compiled_dict.keys(), out_path)
+    return FuzzyIndex(installed_path(out_path))
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    src = sys.argv[1]
+    dst = sys.argv[2] if len(sys.argv) > 2 else compiled_path(src)
+    print(f"已编译 {compile_dict(src, dst)} 个词条 -> {dst}")
+    d = CompiledDict(installed_path(dst))
+    print(f"已构建词形还原索引 {compile_lemma_index(d, lemma_path(src))} 条 -> {lemma_path(src)}")
+    print(f"已构建模糊索引 {compile_fuzzy(d.keys(), fuzzy_path(src))} 个词 -> {fuzzy_path(src)}")
+    d.close()
@@ -0,0 +1,564 @@
+"""在线翻译公共层：所有在线翻译调用都经过这里的持久化缓存、限速/重试和熔断"""
+import math
+import random
+import re
+import sqlite3
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+
+from ziyuan import get_translator
+
+TRANSLATION_CACHE_FILE = "fanyi_cache.db"
+TRANSLATION_TTL = 180 * 24 * 3600     # 缓存有效期（秒），在线翻译结果半年内基本不会变
+TRANSLATION_MAX_ROWS = 500000          # 超出后按写入时间淘汰最旧的条目
+EVICT_EVERY = 500                      # 每写入这么多条检查一次过期/容量
+BATCH_MAX_WORDS = 40                   # 批量翻译每个请求最多打包的单词数
+BATCH_MAX_CHARS = 2000                 # 每个请求最多字符数（googletrans 单次上限约5000）
+BATCH_SEPARATOR = "\n"                 # 一行一个词，译文按行拆回
+SQL_IN_CHUNK = 500                     # 批量查缓存时每条 IN (...) 语句的参数个数
+TRANSLATION_FAILED = "【翻译失败】"
+TRANSLATION_OFFLINE = "【翻译失败：离线】"   # 离线模式或熔断中，没有发请求
+
+# ========== 限速与重试参数（按翻译引擎分别计） ==========
+RATE_LIMITS = {                        # 引擎 -> (每秒请求数, 突发上限)
+    "google": (5.0, 10),
+    "baidu-web": (2.0, 4),
+}
+DEFAULT_RATE_LIMIT = (3.0, 5)
+RETRY_MAX_ATTEMPTS = 4                 # 单次调用最多尝试次数（含第一次）
+RETRY_BASE_DELAY = 0.5                 # 退避基数（秒），第n次重试最多等 base * 2**n
+RETRY_MAX_DELAY = 8.0
+RETRY_BUDGET_RATIO = 0.2               # 重试次数最多占请求数的比例，服务端持续出错时不放大流量
+RETRY_BUDGET_MIN = 10                  # 刚启动、请求还少时也允许的重试次数
+BREAKER_FAILURES = 5                   # 连续失败这么多次（按请求计，含重试）就熔断
+BREAKER_COOLDOWN = 60.0                # 熔断后这么多秒内不发请求，之后放行一个试探请求
+
+# ========== 百度网页翻译连接参数 ==========
+BAIDU_WEB_URL = "https://fanyi.baidu.com/#en/zh/"
+BAIDU_POOL_SIZE = 8                    # 连接池大小，与翻译线程数相当即可
+BAIDU_TIMEOUT = (3.05, 5)              # (建立连接, 读取) 超时秒数
+
+_limiters = {}
+_budgets = {}
+_limiter_lock = threading.Lock()
+
+# ========== 令牌桶限速 ==========
+class RateLimiter:
+    """令牌桶：平均每秒 qps 个请求，最多连续突发 burst 个；多线程共用一个实例"""
+
+    def __init__(self, qps, burst=1):
+        self.qps = qps
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._hold_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """取一个令牌，返回还需要等多久（秒）；令牌可以预支，等待时间由调用方在锁外睡"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.qps)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.qps if self._tokens < 0 else 0.0
+            return max(wait, self._hold_until - now)
+
+    def acquire(self):
+        """阻塞到可以发下一个请求，返回实际等待的秒数"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def hold(self, seconds):
+        """服务端限流（429）时，所有共用此限速器的线程都暂停 seconds 秒"""
+        with self._lock:
+            self._hold_until = max(self._hold_until, time.monotonic() + seconds)
+
+class RetryBudget:
+    """重试预算：每个成功或首次请求存入 ratio 个额度，每次重试取出1个，额度用完就不再重试"""
+
+    def __init__(self, ratio=RETRY_BUDGET_RATIO, minimum=RETRY_BUDGET_MIN):
+        self.ratio = ratio
+        self.cap = float(minimum)
+        self._balance = float(minimum)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.cap += self.ratio
+            self._balance = min(self.cap, self._balance + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+
+# ========== 熔断与离线模式 ==========
+class TranslationUnavailable(Exception):
+    """离线模式或熔断中，请求没有发出"""
+
+class CircuitBreaker:
+    """连续失败 failures 次后断开，cooldown 秒内 allow() 一律返回False；
+    冷却结束后只放行一个试探请求，成功则恢复，失败则重新计时"""
+
+    def __init__(self, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._consecutive = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        """是否处于熔断状态（含冷却已过、正等待试探的状态）"""
+        return self._opened_at is not None
+
+    @property
+    def cooling_down(self):
+        """是否还在冷却期内；冷却结束后即使还没试探成功也返回False，好让下一个请求去试探"""
+        opened_at = self._opened_at
+        return opened_at is not None and time.monotonic() - opened_at < self.cooldown
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive += 1
+            if self._probing or self._consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def reset(self):
+        self.record_success()
+
+_offline = threading.Event()
+_breakers = {}
+
+def set_offline(offline):
+    """仅离线模式：打开后所有在线翻译立即返回失败，不发任何请求"""
+    if offline:
+        _offline.set()
+    else:
+        _offline.clear()
+        with _limiter_lock:
+            for breaker in _breakers.values():
+                breaker.reset()  # 手动切回在线时顺便清掉熔断，马上可以重试
+
+def is_offline():
+    return _offline.is_set()
+
+def get_breaker(engine):
+    with _limiter_lock:
+        if engine not in _breakers:
+            _breakers[engine] = CircuitBreaker()
+        return _breakers[engine]
+
+def offline_reason(engine):
+    """现在不该发在线请求的原因（离线模式/熔断中），可以发请求时返回None；不改变熔断状态"""
+    if is_offline():
+        return "离线模式"
+    if get_breaker(engine).cooling_down:
+        return "网络不可用，暂停在线翻译"
+    return None
+
+_STATUS_RE = re.compile(r"status code\D{0,3}(\d{3})")
+
+def error_status(exc):
+    """从异常中取HTTP状态码（requests/httpx 的 response，或 googletrans 报错信息里的），取不到返回None"""
+    for obj in (exc, getattr(exc, "response", None)):
+        status = getattr(obj, "status_code", None)
+        if isinstance(status, int):
+            return status
+    m = _STATUS_RE.search(str(exc))
+    return int(m.group(1)) if m else None
+
+def is_retryable(exc):
+    """429、5xx 和网络层错误（超时、连接失败）值得重试，其余（如解析失败）重试也没用"""
+    status = error_status(exc)
+    if status is not None:
+        return status == 429 or status >= 500
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    name = type(exc).__name__
+    return "Timeout" in name or "Connect" in name
+
+def retry_after(exc):
+    """服务端给的 Retry-After（秒），没有返回None"""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        seconds = float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(seconds) else seconds
+
+
+def get_rate_limiter(engine):
+    """进程内按引擎共享的限速器"""
+    with _limiter_lock:
+        if engine not in _limiters:
+            qps, burst = RATE_LIMITS.get(engine, DEFAULT_RATE_LIMIT)
+            _limiters[engine] = RateLimiter(qps, burst)
+            _budgets[engine] = RetryBudget()
+        return _limiters[engine]
+
+def set_rate_limit(engine, qps, burst=None):
+    """修改某个引擎的限速（命令行/配置用），已创建的限速器一并替换"""
+    burst = burst if burst is not None else RATE_LIMITS.get(engine, DEFAULT_RATE_LIMIT)[1]
+    with _limiter_lock:
+        RATE_LIMITS[engine] = (qps, burst)
+        _limiters.pop(engine, None)
+        _budgets.pop(engine, None)
+
+def get_retry_budget(engine):
+    get_rate_limiter(engine)
+    return _budgets[engine]
+
+def call_with_retry(engine, fetch, text, max_attempts=RETRY_MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY,
+                    max_delay=RETRY_MAX_DELAY):
+    """限速后调用 fetch(text)；遇到可重试的错误按指数退避+全抖动重试，重试次数受预算限制
+
+    429 时整个引擎一起暂停（服务端给了 Retry-After 就按它等）。重试不了时抛出最后一次的异常。
+    离线模式或熔断中直接抛出 TranslationUnavailable，不发请求也不等待。
+    """
+    if is_offline():
+        raise TranslationUnavailable("离线模式")
+    breaker = get_breaker(engine)
+    limiter = get_rate_limiter(engine)
+    budget = get_retry_budget(engine)
+    budget.deposit()
+    for attempt in range(max_attempts):
+        if not breaker.allow():
+            raise TranslationUnavailable(f"{engine} 连续请求失败，{breaker.cooldown:.0f} 秒内暂停在线翻译")
+        limiter.acquire()
+        try:
+            result = fetch(text)
+            breaker.record_success()
+            return result
+        except Exception as e:
+            if is_retryable(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()  # 服务有响应，只是结果没法用（如解析失败），不算连不上
+            if attempt + 1 >= max_attempts or not is_retryable(e) or not budget.withdraw():
+                raise
+            delay = retry_after(e)
+            if delay is not None:
+                delay = min(max(delay, 0.0), max_delay)  # 服务端要求等很久时也只等 max_delay，不卡住调用方
+            else:
+                delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            if error_status(e) == 429:
+                limiter.hold(delay)
+            time.sleep(delay)
+
+# ========== 持久化翻译缓存 ==========
+class TranslationCache:
+    """SQLite翻译缓存，键为 (engine, src, dest, text)；WAL模式，多个程序实例可同时读写"""
+
+    def __init__(self, path=TRANSLATION_CACHE_FILE, ttl=TRANSLATION_TTL, max_rows=TRANSLATION_MAX_ROWS):
+        self.path = path
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._puts = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS translations (
+                    engine  TEXT NOT NULL,
+                    src     TEXT NOT NULL,
+                    dest    TEXT NOT NULL,
+                    text    TEXT NOT NULL,
+                    result  TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    PRIMARY KEY (engine, src, dest, text)
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_created ON translations(created)")
+        self.evict()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, engine, src, dest, text):
+        """命中且未过期返回译文，否则返回None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT result FROM translations WHERE engine = ? AND src = ? AND dest = ? AND text = ? AND created >= ?",
+                (engine, src, dest, text, time.time() - self.ttl)).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, engine, src, dest, texts):
+        """批量查缓存，返回 {原文: 译文}，只含命中且未过期的"""
+        texts = list(texts)
+        found = {}
+        with self._connect() as conn:
+            for i in range(0, len(texts), SQL_IN_CHUNK):
+                chunk = texts[i:i + SQL_IN_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                found.update(conn.execute(
+                    f"SELECT text, result FROM translations WHERE engine = ? AND src = ? AND dest = ? "
+                    f"AND created >= ? AND text IN ({marks})",
+                    (engine, src, dest, time.time() - self.ttl, *chunk)).fetchall())
+        return found
+
+    def put_many(self, engine, src, dest, results):
+        """批量写入 {原文: 译文}，一个事务"""
+        if not results:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)",
+                             [(engine, src, dest, text, result, now) for text, result in results.items()])
+        with self._lock:
+            before = self._puts
+            self._puts += len(results)
+            need_evict = self._puts // EVICT_EVERY != before // EVICT_EVERY
+        if need_evict:
+            self.evict()
+
+    def put(self, engine, src, dest, text, result):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)",
+                         (engine, src, dest, text, result, time.time()))
+        with self._lock:
+            self._puts += 1
+            need_evict = self._puts % EVICT_EVERY == 0
+        if need_evict:
+            self.evict()
+
+    def evict(self):
+        """删除过期条目，条目数超过上限时再删最旧的"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM translations WHERE created < ?", (time.time() - self.ttl,))
+            n = conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            if n > self.max_rows:
+                conn.execute(
+                    "DELETE FROM translations WHERE rowid IN "
+                    "(SELECT rowid FROM translations ORDER BY created LIMIT ?)", (n - self.max_rows,))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM translations")
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_translation_cache():
+    """进程内共享的翻译缓存（首次使用时打开）"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TranslationCache()
+        return _cache
+
+def get_cached(engine, text, src="en", dest="zh-cn"):
+    """只查缓存，不发网络请求"""
+    return get_translation_cache().get(engine, src, dest, text)
+
+def cached_translate(engine, text, fetch, src="en", dest="zh-cn"):
+    """先查缓存，未命中再经限速/重试调用 fetch(text) 在线翻译并写入缓存；重试后仍失败时异常原样向上传"""
+    cache = get_translation_cache()
+    result = cache.get(engine, src, dest, text)
+    if result is None:
+        result = call_with_retry(engine, fetch, text)
+        cache.put(engine, src, dest, text, result)
+    return result
+
+def fetch_google(text):
+    return get_translator().translate(text, src='en', dest='zh-cn').text
+
+def google_translate(word):
+    """单词英译中（googletrans + 持久化缓存），失败返回【翻译失败】"""
+    try:
+        return cached_translate("google", word, fetch_google)
+    except TranslationUnavailable:
+        return TRANSLATION_OFFLINE
+    except Exception as e:
+        return TRANSLATION_FAILED
+
+# ========== 批量翻译：多个词拼成一个请求，译文按行拆回 ==========
+def make_batches(words, max_words=BATCH_MAX_WORDS, max_chars=BATCH_MAX_CHARS):
+    """按单词数和字符数上限把单词切成若干批"""
+    batches, batch, size = [], [], 0
+    for word in words:
+        if batch and (len(batch) >= max_words or size + len(word) + 1 > max_chars):
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(word)
+        size += len(word) + 1
+    if batch:
+        batches.append(batch)
+    return batches
+
+def align_batch(words, translated):
+    """把整批译文按行拆回各词；行数对不上或有空行时返回None"""
+    lines = [line.strip() for line in translated.strip().split(BATCH_SEPARATOR)]
+    if len(lines) != len(words) or not all(lines):
+        return None
+    return dict(zip(words, lines))
+
+def translate_batch(engine, words, fetch, src="en", dest="zh-cn", cache=None):
+    """翻译一批单词，返回 {词: 译文}，失败的词为【翻译失败】（见 translate_batch_counted）"""
+    return translate_batch_counted(engine, words, fetch, src, dest, cache)[0]
+
+def translate_batch_counted(engine, words, fetch, src="en", dest="zh-cn", cache=None):
+    """翻译一批单词，返回 ({词: 译文}, 缓存命中词数)，失败的词为【翻译失败】
+
+    先批量查缓存；未命中的词用 fetch(换行拼接的文本) 一次请求，译文拆不回各词时逐词 fetch(词)。
+    每次请求都经过 call_with_retry 限速/重试；整批请求重试后仍失败（多半是网络问题）时
+    不再逐词重试，这批都算失败，失败结果不写缓存。
+    """
+    if cache is None:
+        cache = get_translation_cache()
+    words = list(dict.fromkeys(words))
+    results = cache.get_many(engine, src, dest, words)
+    cache_hits = len(results)
+    missing = [w for w in words if w not in results]
+    if not missing:
+        return results, cache_hits
+    fresh = {}
+    failed = TRANSLATION_FAILED
+    try:
+        if len(missing) == 1:
+            fresh[missing[0]] = call_with_retry(engine, fetch, missing[0])
+        else:
+            aligned = align_batch(missing, call_with_retry(engine, fetch, BATCH_SEPARATOR.join(missing)))
+            if aligned is not None:
+                fresh.update(aligned)
+            else:
+                for word in missing:
+                    try:
+                        fresh[word] = call_with_retry(engine, fetch, word)
+                    except TranslationUnavailable:
+                        failed = TRANSLATION_OFFLINE
+                        break
+                    except Exception:
+                        pass
+    except TranslationUnavailable:
+        failed = TRANSLATION_OFFLINE
+    except Exception:
+        pass
+    cache.put_many(engine, src, dest, fresh)
+    results.update(fresh)
+    for word in missing:
+        results.setdefault(word, failed)
+    return results, cache_hits
+
+def translate_many(engine, words, fetch, executor=None, on_result=None, src="en", dest="zh-cn", cache=None):
+    """按批翻译任意多个单词，返回 {词: 译文}；executor 不为空时各批并发请求
+
+    on_result(批结果dict) 每完成一批调用一次。
+    """
+    if cache is None:
+        cache = get_translation_cache()
+    batches = make_batches(list(dict.fromkeys(words)))
+
+    def run(batch):
+        return translate_batch(engine, batch, fetch, src, dest, cache)
+
+    results = {}
+    for part in (executor.map(run, batches) if executor is not None else map(run, batches)):
+        results.update(part)
+        if on_result:
+            on_result(part)
+    return results
+
+# ========== 百度网页翻译：进程内共享一个连接池 ==========
+# 百度网页返回的译文位置（适配当前网页版，如百度更新可能失效）
+_BAIDU_OUTPUT_RE = re.compile(r'<p class="ordinary-output target-output clearfix"[^>]*>(.*?)</p>')
+_BAIDU_DST_RE = re.compile(r'"dst":"([^"]+)"')   # 2024后的新版页面，译文在 window.g_result 里
+_HTML_TAG_RE = re.compile('<.*?>')
+
+def parse_baidu_html(html):
+    """从百度翻译网页中取译文，取不到时抛出 LookupError"""
+    m = _BAIDU_OUTPUT_RE.search(html)
+    if m:
+        # 百度网页返回会有html实体，需要替换掉
+        return _HTML_TAG_RE.sub('', m.group(1)).replace('&nbsp;', ' ').replace('&amp;', '&')
+    m = _BAIDU_DST_RE.search(html)
+    if m:
+        return m.group(1).replace('\\n', '\n').replace('&nbsp;', ' ').replace('&amp;', '&')
+    raise LookupError("未获取到百度翻译网页结果")
+
+class BaiduWebClient:
+    """百度翻译网页版客户端（无需apikey）：一个 requests.Session 复用长连接，省掉每次的DNS+TCP+TLS握手
+
+    连接池满时请求排队等空闲连接（pool_block），不会越开越多；重试交给 call_with_retry，适配器本身不重试。
+    只发GET、不依赖cookie状态，多个翻译线程可以共用一个实例。
+    """
+
+    def __init__(self, base_url=BAIDU_WEB_URL, pool_size=BAIDU_POOL_SIZE, timeout=BAIDU_TIMEOUT):
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["User-Agent"] = "Mozilla/5.0"
+
+    def fetch(self, text):
+        resp = self.session.get(self.base_url + urllib.parse.quote(text), timeout=self.timeout)
+        resp.raise_for_status()  # 429/5xx 交给 call_with_retry 退避重试
+        return parse_baidu_html(resp.text)
+
+    def close(self):
+        self.session.close()
+
+_baidu_client = None
+
+def get_baidu_client():
+    """进程内共享的百度网页翻译客户端（首次使用时创建）"""
+    global _baidu_client
+    with _cache_lock:
+        if _baidu_client is None:
+            _baidu_client = BaiduWebClient()
+        return _baidu_client
+
+def baidu_web_translate(text):
+    """百度网页翻译英译中；只缓存成功抓到的译文，失败时返回提示文字"""
+    try:
+        return cached_translate("baidu-web", text, lambda t: get_baidu_client().fetch(t), dest="zh")
+    except LookupError as e:
+        return str(e)
+    except Exception as e:
+        return f"【百度网页翻译失败】{e}"
+
+def google_translate_batch(words):
+    """一批单词英译中（一个请求），返回 {词: 译文}"""
+    return translate_batch("google", words, fetch_google)
+
+def google_translate_batch_counted(words):
+    """同 google_translate_batch，另返回缓存命中词数"""
+    return translate_batch_counted("google", words, fetch_google)
+
+def google_translate_many(words, executor=None, on_result=None):
+    """任意多个单词英译中，按批请求，返回 {词: 译文}"""
+    return translate_many("google", words, fetch_google, executor, on_result)
@@ -0,0 +1,180 @@
+"""熟词库读写（不依赖PyQt5，界面和命令行共用）"""
+import hashlib
+import os
+import tempfile
+import threading
+
+COMPACT_MIN_DUPLICATES = 200   # 文件里重复/空行至少这么多才考虑压缩
+COMPACT_RATIO = 0.2            # 且占总行数的比例超过这个值
+
+def load_known_words(path):
+    """加载一类熟词文件到集合"""
+    known_words = set()
+    if not os.path.exists(path):
+        return known_words
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip(): continue
+            word = line.strip().split()[0].lower()
+            if word:
+                known_words.add(word)
+    return known_words
+
+# ========== 用户成长熟词库 ==========
+class KnownWordStore:
+    """用户熟词库：内存索引 + 追加写日志
+
+    文件格式与 load_known_words 相同（每行 "单词 释义"）。refresh() 只 stat 一次文件，
+    大小/修改时间没变就什么都不做；文件变长了且已读部分的内容没变（比对哈希）就从上次读到的位置接着读，
+    否则整个重读。
+    新熟词追加到文件末尾，同一单词不会重复写入；外部编辑留下的重复行和空行
+    积累到一定比例时整体去重重写（先写唯一的临时文件再 os.replace，中途崩溃也不会丢词）。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._lines = {}          # 单词(小写) -> 文件中第一次出现的整行
+        self._stat = None         # 上次读取时的 (inode, 大小, 修改时间)
+        self._offset = 0          # 已读入索引的字节数
+        self._digest = hashlib.sha1()   # 已读入部分的哈希，判断文件是不是只在末尾追加过
+        self._total_lines = 0     # 文件中的行数（含重复和空行）
+        self._ends_with_newline = True
+        self.refresh()
+
+    def __contains__(self, word):
+        return word in self._lines
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __iter__(self):
+        return iter(list(self._lines))
+
+    def refresh(self):
+        """文件被改过才重新读取；返回是否有变化"""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                changed = self._stat is not None
+                self._reset()
+                return changed
+            stat = (st.st_ino, st.st_size, st.st_mtime_ns)
+            if stat == self._stat:
+                return False
+            with open(self.path, "rb") as f:
+                data = f.read()
+            if (self._stat is not None and st.st_ino == self._stat[0] and len(data) > self._offset
+                    and self._ends_with_newline
+                    and hashlib.sha1(data[:self._offset]).digest() == self._digest.digest()):
+                self._parse(data[self._offset:])   # 只追加过：增量解析
+            else:
+                # 原地编辑过（哪怕同时变长了）：整个重读
+                self._reset()
+                self._parse(data)
+            self._stat = stat
+            return True
+
+    def _reset(self):
+        self._lines = {}
+        self._stat = None
+        self._offset = 0
+        self._digest = hashlib.sha1()
+        self._total_lines = 0
+        self._ends_with_newline = True
+
+    def _read_all(self):
+        with open(self.path, "rb") as f:
+            self._parse(f.read())
+
+    def _parse(self, data):
+        """解析接在已读部分后面的 data"""
+        if not data:
+            return
+        self._offset += len(data)
+        self._digest.update(data)
+        self._ends_with_newline = data.endswith(b"\n")
+        for line in data.decode("utf-8", errors="replace").splitlines():
+            self._total_lines += 1
+            line = line.strip()
+            if not line:
+                continue
+            word = line.split()[0].lower()
+            self._lines.setdefault(word, line)
+
+    def add_many(self, pairs):
+        """追加 (单词, 释义) 列表，已有的单词跳过；返回实际新增的单词"""
+        with self._lock:
+            self.refresh()
+            added, new_lines = [], []
+            for word, trans in pairs:
+                word = word.strip().lower()
+                if not word or word in self._lines:
+                    continue
+                line = " ".join(f"{word} {trans}".split())  # 释义里的换行压成空格，保证一词一行
+                self._lines[word] = line
+                added.append(word)
+                new_lines.append(line)
+            if new_lines:
+                text = "\n".join(new_lines) + "\n"
+                if not self._ends_with_newline:
+                    text = "\n" + text
+                # 二进制追加：文本模式在Windows上会把 \n 写成 \r\n，按字节记的偏移就对不上了
+                data = text.encode("utf-8")
+                with open(self.path, "ab") as f:
+                    start = f.tell()
+                    f.write(data)
+                    offset = f.tell()
+                if start != self._offset:
+                    # refresh 之后别的实例又追加过：整个重读，不跳过它写的内容
+                    self._reset()
+                    self._read_all()
+                else:
+                    # 自己写入的内容不必再读回来
+                    self._offset = offset
+                    self._digest.update(data)
+                    self._total_lines += len(new_lines)
+                    self._ends_with_newline = True
+                st = os.stat(self.path)
+                self._stat = (st.st_ino, st.st_size, st.st_mtime_ns)
+                self.maybe_compact()
+            return added
+
+    def add(self, word, trans=""):
+        return bool(self.add_many([(word, trans)]))
+
+    def maybe_compact(self):
+        """重复/空行太多时去重重写"""
+        with self._lock:
+            waste = self._total_lines - len(self._lines)
+            if waste >= COMPACT_MIN_DUPLICATES and waste > self._total_lines * COMPACT_RATIO:
+                self.compact()
+                return True
+            return False
+
+    def compact(self):
+        """按首次出现的顺序去重，原子替换原文件"""
+        with self._lock:
+            self.refresh()
+            data = "".join(line + "\n" for line in self._lines.values()).encode("utf-8")
+            # 临时文件名唯一：几个实例同时压缩不会互相覆盖对方写了一半的文件
+            folder = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=os.path.basename(self.path) + ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.chmod(tmp_path, 0o644)  # mkstemp 建的文件只有自己可读，换成普通文件的权限
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            st = os.stat(self.path)
+            self._stat = (st.st_ino, st.st_size, st.st_mtime_ns)
+            self._offset = len(data)
+            self._digest = hashlib.sha1(data)
+            self._total_lines = len(self._lines)
+            self._ends_with_newline = True
@@ -0,0 +1,79 @@
+import os
+
+import cidian_index
+from cidian_index import CompiledDict, FuzzyIndex, compile_fuzzy, write_compiled
+
+WORDS = ["apple", "apply", "banana", "band", "bandana", "cat", "cut", "hello", "help", "yellow"]
+
+def test_write_compiled_roundtrip(tmp_path):
+    pairs = {"hello": "你好", "apple": "苹果\n水果", "band": "乐队"}
+    path = str(tmp_path / "d.cidx")
+    write_compiled(pairs, path, block_entries=2)
+    d = CompiledDict(path)
+    assert list(d.keys()) == ["apple", "band", "hello"]
+    assert d.get("apple") == "苹果 水果"
+    assert d.get("hello") == "你好"
+    assert d.get("help") is None
+    d.close()
+
+def test_compile_fuzzy_small_chunks_match_single_chunk(tmp_path, monkeypatch):
+    whole = str(tmp_path / "whole.fuzzy.cidx")
+    compile_fuzzy(WORDS, whole)
+    monkeypatch.setattr(cidian_index, "FUZZY_SORT_CHUNK", 7)   # 逼出多块外部排序 + 归并
+    chunked = str(tmp_path / "chunked.fuzzy.cidx")
+    assert compile_fuzzy(WORDS, chunked) == len(WORDS)
+    with open(whole, "rb") as a, open(chunked, "rb") as b:
+        assert a.read() == b.read()
+    index = FuzzyIndex(chunked)
+    assert (1, "help") in index.suggest("hwlp")
+    assert index.suggest("bandanna")[0] == (1, "bandana")
+    index.close()
+
+def test_open_dict_falls_back_when_replace_is_blocked(tmp_path, monkeypatch):
+    out = str(tmp_path / "dict.cidx")
+    write_compiled({"old": "旧"}, out)
+    txt = tmp_path / "dict.txt"
+    txt.write_text("hello\t你好\n", encoding="utf-8")
+    os.utime(txt, (os.path.getmtime(out) + 10,) * 2)   # 词典比编译文件新，需要重新编译
+
+    def locked(src, dst):   # Windows 上目标文件被别的实例 mmap 着时的表现
+        raise PermissionError(dst)
+    monkeypatch.setattr(cidian_index.os, "replace", locked)
+    d = cidian_index.open_dict(str(txt))
+    assert d.path != out and d.path.endswith(".tmp")
+    assert d.get("hello") == "你好"
+    d.close()
+    old = CompiledDict(out)
+    assert old.get("old") == "旧"   # 原文件没被破坏
+    old.close()
+
+def build_lemma_index(tmp_path, monkeypatch, words):
+    monkeypatch.setattr(cidian_index, "irregular_lemma_pairs", lambda: [])   # 只测规则推导
+    d_path = str(tmp_path / "d.cidx")
+    write_compiled({w: "释义" + w for w in words}, d_path)
+    d = CompiledDict(d_path)
+    cidian_index.compile_lemma_index(d, str(tmp_path / "d.lemma.cidx"))
+    return d, CompiledDict(str(tmp_path / "d.lemma.cidx"))
+
+def test_lemma_index_prefers_e_lemma(tmp_path, monkeypatch):
+    d, lemmas = build_lemma_index(tmp_path, monkeypatch, ["unit", "unite", "hop", "hope", "sing", "singe", "cut", "cute"])
+    assert lemmas.get("united") == "unite"
+    assert lemmas.get("units") == "unit"
+    assert lemmas.get("hoped") == "hope"
+    assert lemmas.get("hoping") == "hope"
+    assert lemmas.get("hopped") == "hop"
+    assert lemmas.get("singed") == "singe"
+    assert lemmas.get("singing") == "sing"
+    assert lemmas.get("cuter") == "cute"
+    assert cidian_index.resolve(d, lemmas, "United") == ("unite", "释义unite")
+    d.close()
+    lemmas.close()
+
+def test_lemma_index_skips_short_words_and_headwords(tmp_path, monkeypatch):
+    d, lemmas = build_lemma_index(tmp_path, monkeypatch, ["he", "be", "unit", "united"])
+    assert lemmas.get("hes") is None
+    assert lemmas.get("bes") is None
+    assert lemmas.get("united") is None   # 本身是词头，不还原
+    assert cidian_index.resolve(d, lemmas, "united") == ("united", "释义united")
+    d.close()
+    lemmas.close()
@@ -0,0 +1,83 @@
+import pytest
+
+import fanyi
+from fanyi import BREAKER_FAILURES, TranslationUnavailable, call_with_retry, offline_reason
+
+def raising(exc):
+    def fetch(text):
+        raise exc
+    return fetch
+
+@pytest.fixture
+def engine(request):
+    name = "test-" + request.node.name
+    fanyi.RATE_LIMITS[name] = (1e6, 1000)   # 不让限速器参与
+    yield name
+    fanyi.RATE_LIMITS.pop(name, None)
+
+def test_parse_errors_do_not_open_breaker(engine):
+    for _ in range(BREAKER_FAILURES * 2):
+        with pytest.raises(LookupError):
+            call_with_retry(engine, raising(LookupError("页面里没有译文")), "word", max_attempts=1)
+    assert offline_reason(engine) is None
+
+def test_network_errors_open_breaker(engine):
+    for _ in range(BREAKER_FAILURES):
+        with pytest.raises(ConnectionError):
+            call_with_retry(engine, raising(ConnectionError("连不上")), "word", max_attempts=1)
+    assert offline_reason(engine) is not None
+    with pytest.raises(TranslationUnavailable):
+        call_with_retry(engine, lambda text: "译" + text, "word")
+
+def test_parse_error_breaks_network_failure_streak(engine):
+    for _ in range(BREAKER_FAILURES - 1):
+        with pytest.raises(ConnectionError):
+            call_with_retry(engine, raising(ConnectionError()), "word", max_attempts=1)
+    with pytest.raises(ValueError):
+        call_with_retry(engine, raising(ValueError("JSON 解析失败")), "word", max_attempts=1)
+    with pytest.raises(ConnectionError):
+        call_with_retry(engine, raising(ConnectionError()), "word", max_attempts=1)
+    assert offline_reason(engine) is None
+
+class FakeResponse:
+    def __init__(self, status_code, headers):
+        self.status_code = status_code
+        self.headers = headers
+
+class HTTPError(Exception):
+    def __init__(self, status_code, headers):
+        super().__init__(f"status code {status_code}")
+        self.response = FakeResponse(status_code, headers)
+
+def test_retry_after_is_capped(engine, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(fanyi.time, "sleep", sleeps.append)
+    calls = []
+
+    def fetch(text):
+        calls.append(text)
+        if len(calls) == 1:
+            raise HTTPError(503, {"Retry-After": "3600"})
+        return "译" + text
+    assert call_with_retry(engine, fetch, "word", max_delay=2.0) == "译word"
+    assert sleeps == [2.0]
+
+def test_breaker_lets_probe_through_after_cooldown(engine, monkeypatch):
+    for _ in range(BREAKER_FAILURES):
+        with pytest.raises(ConnectionError):
+            call_with_retry(engine, raising(ConnectionError()), "word", max_attempts=1)
+    assert offline_reason(engine) is not None
+    now = fanyi.time.monotonic()
+    monkeypatch.setattr(fanyi.time, "monotonic", lambda: now + fanyi.BREAKER_COOLDOWN + 1)
+    assert offline_reason(engine) is None   # 冷却结束：界面照常提交，由这次请求试探
+    assert call_with_retry(engine, lambda text: "译" + text, "word") == "译word"
+    assert not fanyi.get_breaker(engine).is_open
+
+def test_translate_batch_counted_reports_cache_hits(engine, tmp_path):
+    cache = fanyi.TranslationCache(str(tmp_path / "cache.db"))
+    fetch = lambda text: "\n".join("译" + w for w in text.split("\n"))
+    results, hits = fanyi.translate_batch_counted(engine, ["a", "b"], fetch, cache=cache)
+    assert results == {"a": "译a", "b": "译b"} and hits == 0
+    results, hits = fanyi.translate_batch_counted(engine, ["a", "b", "c"], fetch, cache=cache)
+    assert results == {"a": "译a", "b": "译b", "c": "译c"} and hits == 2
+    assert fanyi.translate_batch(engine, ["c"], fetch, cache=cache) == {"c": "译c"}
@@ -0,0 +1,60 @@
+import shuci_store
+from shuci_store import KnownWordStore, load_known_words
+
+def windows_text_open(file, mode="r", *args, **kwargs):
+    """模拟Windows：文本模式写入时 \\n 变成 \\r\\n"""
+    if "b" not in mode and ("a" in mode or "w" in mode):
+        kwargs.setdefault("newline", "\r\n")
+    return open(file, mode, *args, **kwargs)
+
+def test_add_many_then_external_append_refresh(tmp_path, monkeypatch):
+    monkeypatch.setattr(shuci_store, "open", windows_text_open, raising=False)
+    path = tmp_path / "shuci.txt"
+    path.write_bytes("apple 苹果\r\nbanana 香蕉\r\n".encode("utf-8"))
+    store = KnownWordStore(str(path))
+
+    added = [("cherry", "樱桃"), ("date", "枣"), ("durian", "榴莲"), ("damson", "西洋李子")]
+    assert store.add_many(added) == [w for w, _ in added]
+    # 另一个实例追加，本实例增量 refresh 必须从行首接着读
+    KnownWordStore(str(path)).add_many([("elder", "接骨木")])
+    with windows_text_open(path, "a", encoding="utf-8") as f:
+        f.write("fig 无花果\n")
+
+    assert store.refresh()
+    assert set(store) == {"apple", "banana", "cherry", "date", "durian", "damson", "elder", "fig"}
+    assert set(store) == load_known_words(str(path))
+
+def test_add_many_after_unseen_external_append(tmp_path):
+    path = tmp_path / "shuci.txt"
+    path.write_text("apple 苹果\n", encoding="utf-8")
+    store = KnownWordStore(str(path))
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("banana 香蕉\n")
+    # 外部追加发生在 add_many 内部的 refresh 之后
+    store.refresh = lambda: False
+    store.add_many([("cherry", "樱桃")])
+    del store.refresh
+    assert set(store) == {"apple", "banana", "cherry"}
+    assert not store.refresh()
+
+def test_refresh_rereads_file_edited_in_place_and_grown(tmp_path):
+    path = tmp_path / "shuci.txt"
+    path.write_text("apple 苹果\nbanana 香蕉\n", encoding="utf-8")
+    store = KnownWordStore(str(path))
+    # 同一个文件原地改写（inode 不变）并且变长：删掉 apple，加上两个词
+    with open(path, "r+", encoding="utf-8") as f:
+        f.write("cherry 樱桃\nbanana 香蕉\ndate 枣\n")
+    assert store.refresh()
+    assert set(store) == {"cherry", "banana", "date"}
+
+def test_compact_then_append_stays_incremental(tmp_path):
+    path = tmp_path / "shuci.txt"
+    path.write_text("apple 苹果\napple 苹果\n\nbanana 香蕉\n", encoding="utf-8")
+    store = KnownWordStore(str(path))
+    store.compact()
+    assert path.read_text(encoding="utf-8") == "apple 苹果\nbanana 香蕉\n"
+    assert not list(tmp_path.glob("*.tmp"))
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("cherry 樱桃\n")
+    assert store.refresh()
+    assert set(store) == {"apple", "banana", "cherry"}
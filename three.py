@@ -1,61 +1,20 @@
 import sys
-import requests
-import re
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QLineEdit, QPushButton,
     QTextBrowser, QVBoxLayout, QWidget, QLabel
 )
 from PyQt5.QtGui import QPalette, QColor, QFont
 from PyQt5.QtCore import Qt
-from googletrans import Translator
-
-def load_dict(file):
-    d_en2zh = {}
-    with open(file, encoding='utf-8') as f:
-        for idx, line in enumerate(f, 1):
-            line = line.strip()
-            if not line:
-                continue
-            parts = line.split('\t', 1)
-            if len(parts) != 2:
-                continue
-            en, zh = parts
-            en, zh = en.strip(), zh.strip()
-            if en and zh:
-                d_en2zh[en.lower()] = zh
-    return d_en2zh
-
-def baidu_web_translate(text):
-    # 百度翻译网页版接口（无需apikey，模拟GET即可）
-    try:
-        session = requests.Session()
-        url = "https://fanyi.baidu.com/#en/zh/" + requests.utils.quote(text)
-        # 获取页面html内容
-        html = session.get(url, timeout=5, headers={
-            "User-Agent": "Mozilla/5.0"
-        }).text
-        # 用正则粗暴提取翻译结果（适配当前网页版，如百度更新可能失效）
-        m = re.search(r'<p class="ordinary-output target-output clearfix"[^>]*>(.*?)</p>', html)
-        if m:
-            result = m.group(1)
-            # 百度网页返回会有html实体，需要替换掉
-            return re.sub('<.*?>', '', result).replace('&nbsp;', ' ').replace('&amp;', '&')
-        else:
-            # 新版页面2024后，实际翻译结果在 window.g_result 里，可以继续抓
-            m2 = re.search(r'"dst":"([^"]+)"', html)
-            if m2:
-                return m2.group(1).replace('\\n', '\n').replace('&nbsp;', ' ').replace('&amp;', '&')
-            return "未获取到百度翻译网页结果"
-    except Exception as e:
-        return f"【百度网页翻译失败】{e}"
+from cidian_index import open_dict
+from fanyi import baidu_web_translate, cached_translate, fetch_google, offline_reason
+from yibu_chaci import AsyncLookup, make_debounce_timer
 
 class NightDict(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle('离线英译中词典（支持Google/百度网页翻译）')
         self.resize(540, 300)
-        self.dict_en2zh = load_dict('dict.txt')
-        self.translator = Translator()
+        self.dict_en2zh = open_dict('dict.txt')
 
         # 美观字体
         font = QFont('微软雅黑', 12)
@@ -117,10 +76,36 @@ class NightDict(QMainWindow):
         self.setCentralWidget(container)
 
         # 事件绑定
+        # 在线查询放到后台线程，新查询作废旧查询；输入停顿后只自动查本地词典，回车/按钮才在线查询
+        self.online = AsyncLookup(self.fetch_online, self)
+        self.online.finished.connect(self.show_online_result)
+        self.debounce = make_debounce_timer(self, self.lookup_local)
         self.btn.clicked.connect(self.lookup)
         self.input.returnPressed.connect(self.lookup)
+        self.input.textEdited.connect(self.debounce.start)
+
+    def closeEvent(self, event):
+        self.online.shutdown()  # 作废未返回的查询，排队中的不再执行，线程池不拖住进程退出
+        super().closeEvent(event)
+
+    def fetch_online(self, text):
+        """后台线程中执行：先Google翻译，失败再用百度网页翻译兜底；返回 (Google译文, Google错误, 百度译文)"""
+        try:
+            return cached_translate("google", text, fetch_google), None, None
+        except Exception as e:
+            return None, e, baidu_web_translate(text)
 
     def lookup(self):
+        """回车/查询按钮：本地查不到时在线翻译"""
+        self.run_lookup(online=True)
+
+    def lookup_local(self):
+        """停止输入后的自动查词只查本地：半截单词不发到网上，也不写进翻译缓存"""
+        self.run_lookup(online=False)
+
+    def run_lookup(self, online):
+        self.debounce.stop()
+        self.online.cancel()  # 还没返回的上一次在线查询作废
         text = self.input.text().strip()
         if not text:
             self.output.setText("请输入要查询的英文内容")
@@ -130,19 +115,26 @@ class NightDict(QMainWindow):
             self.output.setText(result)
             return
 
+        if not online:
+            self.output.setText("未找到本地词条（按回车或点击查询在线翻译）")
+            return
+        reason = offline_reason("google") and offline_reason("baidu-web")  # 百度还能用时照样兜底
+        if reason:
+            # 离线模式或熔断中：不等超时，也不加载在线网页，直接给本地结果
+            self.output.setText(f"未找到本地词条（{reason}，未在线翻译）")
+            return
         self.output.setText("未找到本地词条，正在使用Google翻译...\n")
-        QApplication.processEvents()
+        self.online.submit(text)
+
+    def show_online_result(self, text, result, error):
+        translation, google_error, baidu_result = result
         # Step 2: Google翻译
-        try:
-            translation = self.translator.translate(text, src='en', dest='zh-cn').text
+        if google_error is None:
             self.output.append(f"【Google翻译】\n{translation}")
-        except Exception as e:
-            self.output.append(f"【Google翻译失败】\n{e}")
-            self.output.append("正在尝试百度网页翻译...\n")
-            QApplication.processEvents()
-            # Step 3: 百度网页翻译兜底
-            baidu_result = baidu_web_translate(text)
-            self.output.append(f"【百度网页翻译】\n{baidu_result}")
+            return
+        # Step 3: 百度网页翻译兜底
+        self.output.append(f"【Google翻译失败】\n{google_error}")
+        self.output.append(f"【百度网页翻译】\n{baidu_result}")
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
@@ -1,30 +1,23 @@
 import sys, os, time
+_T0 = time.perf_counter()  # 首屏计时起点
 import pdfplumber
-import spacy
-import nltk
 from collections import Counter
-from nltk.corpus import words as nltk_words
-from nltk.corpus import stopwords
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QPushButton, QLabel, QVBoxLayout,
     QWidget, QFileDialog, QTextEdit, QMessageBox, QProgressBar,
     QHBoxLayout, QLineEdit, QDialog, QTabWidget
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
 from wordcloud import WordCloud
 import matplotlib
 matplotlib.rcParams['axes.unicode_minus'] = False
 import matplotlib.pyplot as plt
-from googletrans import Translator
+from fanyi import google_translate_many
+from tiqu_core import DEFAULT_PROCESSES, count_lemmas, parallel_extract, use_parallel
+from ziyuan import get_extract_resources, report_startup
 
 # ========== 资源初始化 ==========
-nltk.download('words')
-nltk.download('stopwords')
-nlp = spacy.load("en_core_web_sm")
-english_vocab = set(w.lower() for w in nltk_words.words())
-stop_words = set(stopwords.words('english'))
-
-translator = Translator()
+# spaCy / NLTK词表 / googletrans 由 ziyuan 在第一次用到时才加载
 
 # ========== 熟词库加载 ==========
 def load_known_words(path):
@@ -38,39 +31,33 @@ def load_known_words(path):
 
 KNOWN_WORDS = load_known_words("46merged.txt")
 
-def google_translate(word):
-    try:
-        result = translator.translate(word, src='en', dest='zh-cn')
-        return result.text
-    except Exception as e:
-        return "【翻译失败】"
-
 # ========== 后台提取线程 ==========
 class ExtractWorker(QThread):
     progress = pyqtSignal(int)
     result = pyqtSignal(Counter, str)  # Counter结果 + PDF路径
 
-    def __init__(self, pdf_path, start_page, end_page):
+    def __init__(self, pdf_path, start_page, end_page, processes=DEFAULT_PROCESSES):
         super().__init__()
         self.pdf_path = pdf_path
         self.start_page = start_page
         self.end_page = end_page
+        self.processes = processes
 
     def run(self):
         try:
-            word_counter = Counter()
-            with pdfplumber.open(self.pdf_path) as pdf:
-                pages = pdf.pages[self.start_page - 1 : self.end_page]
-                for i, page in enumerate(pages):
-                    text = page.extract_text()
-                    if text:
-                        doc = nlp(text)
-                        for token in doc:
-                            if token.is_alpha and token.is_ascii and len(token) > 1:
-                                lemma = token.lemma_.lower()
-                                if lemma in english_vocab and lemma not in stop_words:
-                                    word_counter[lemma] += 1
-                    self.progress.emit(int((i + 1) / len(pages) * 100))
+            if use_parallel(self.end_page - self.start_page + 1, self.processes):
+                word_counter = parallel_extract(self.pdf_path, self.start_page, self.end_page,
+                                                self.processes, self.progress.emit)
+            else:
+                word_counter = Counter()
+                nlp, english_vocab, stop_words = get_extract_resources()
+                with pdfplumber.open(self.pdf_path) as pdf:
+                    pages = pdf.pages[self.start_page - 1 : self.end_page]
+                    for i, page in enumerate(pages):
+                        text = page.extract_text()
+                        if text:
+                            count_lemmas(nlp(text), english_vocab, stop_words, word_counter)
+                        self.progress.emit(int((i + 1) / len(pages) * 100))
             self.result.emit(word_counter, self.pdf_path)
         except Exception as e:
             self.result.emit(Counter({"❌ 提取失败": 1}), self.pdf_path)
@@ -86,23 +73,23 @@ class TranslateWorker(QThread):
         self.known_words = known_words
 
     def run(self):
-        trans_cache = {}
+        # 生词按批翻译：一个请求几十个词，缓存命中的词不发请求，限速和重试由 fanyi 统一处理
+        unknown = [word for word, _ in self.word_freq_list if word not in self.known_words]
+        total = len(unknown) or 1
+        translations = {}
+
+        def batch_done(part):
+            translations.update(part)
+            self.progress.emit(int(len(translations) / total * 100))
+
+        google_translate_many(unknown, on_result=batch_done)
         lines = []
-        total = len(self.word_freq_list)
-        for i, (word, freq) in enumerate(self.word_freq_list):
+        for word, freq in self.word_freq_list:
             if word in self.known_words:
-                line = f"{word:<20} {freq:<6} [熟词]"
+                lines.append(f"{word:<20} {freq:<6} [熟词]")
             else:
-                if word in trans_cache:
-                    translation = trans_cache[word]
-                else:
-                    translation = google_translate(word)
-                    trans_cache[word] = translation
-                    time.sleep(0.25)
-                line = f"{word:<20} {freq:<6} {translation}"
-            lines.append(line)
-            percent = int((i + 1) / total * 100)
-            self.progress.emit(percent)
+                lines.append(f"{word:<20} {freq:<6} {translations[word]}")
+        self.progress.emit(100)
         self.finished.emit(lines)
 
 # ========== 主窗口类 ==========
@@ -404,4 +391,5 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = PDFWordExtractor()
     window.show()
+    QTimer.singleShot(0, lambda: report_startup(_T0))
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""PDF文本抽取后端：词频统计只需要"一袋单词"，不需要版面，可按需换更快的后端
+
+每个后端打开后得到一个文档对象：page_count 属性、page_text(页码) 方法（页码从1开始）、close()，
+并支持 with 语句。可选依赖（pypdfium2 / PyMuPDF）只在选用时才导入。
+"""
+import importlib.util
+
+DEFAULT_BACKEND = "pdfplumber"
+
+# ========== pdfplumber：完整字符版面分析（原有行为） ==========
+class PlumberDoc:
+    def __init__(self, path):
+        import pdfplumber
+        self._pdf = pdfplumber.open(path)
+        self.page_count = len(self._pdf.pages)
+
+    def page_text(self, n):
+        page = self._pdf.pages[n - 1]
+        try:
+            return self._extract(page) or ""
+        finally:
+            page.flush_cache()  # 释放该页解析出的字符对象，长文档内存不随页数增长
+
+    def _extract(self, page):
+        return page.extract_text()
+
+    def close(self):
+        self._pdf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class PlumberWordsDoc(PlumberDoc):
+    """pdfplumber 快速路径：只按字符间距切词，不做行/版面拼接"""
+
+    def _extract(self, page):
+        words = page.extract_words(use_text_flow=True, keep_blank_chars=False)
+        return " ".join(w["text"] for w in words)
+
+# ========== pypdfium2：PDFium 原生文本层 ==========
+class PdfiumDoc(PlumberDoc):
+    def __init__(self, path):
+        import pypdfium2
+        self._pdf = pypdfium2.PdfDocument(path)
+        self.page_count = len(self._pdf)
+
+    def page_text(self, n):
+        page = self._pdf[n - 1]
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range()
+        finally:
+            textpage.close()
+            page.close()
+
+# ========== PyMuPDF ==========
+class MuPdfDoc(PlumberDoc):
+    def __init__(self, path):
+        import fitz
+        self._pdf = fitz.open(path)
+        self.page_count = self._pdf.page_count
+
+    def page_text(self, n):
+        return self._pdf.load_page(n - 1).get_text("text")
+
+# 名称 -> (文档类, 需要的模块, 说明)
+BACKENDS = {
+    "pdfplumber": (PlumberDoc, "pdfplumber", "pdfplumber 版面文本（最慢，与旧版结果一致）"),
+    "pdfplumber-words": (PlumberWordsDoc, "pdfplumber", "pdfplumber 逐词（跳过版面拼接）"),
+    "pypdfium2": (PdfiumDoc, "pypdfium2", "pypdfium2（PDFium，通常最快）"),
+    "pymupdf": (MuPdfDoc, "fitz", "PyMuPDF"),
+}
+
+def backend_available(name):
+    return name in BACKENDS and importlib.util.find_spec(BACKENDS[name][1]) is not None
+
+def available_backends():
+    """当前环境装了依赖的后端名"""
+    return [name for name in BACKENDS if backend_available(name)]
+
+def open_text_doc(path, backend=DEFAULT_BACKEND):
+    if backend not in BACKENDS:
+        raise ValueError(f"未知的PDF文本后端：{backend}（可选：{', '.join(BACKENDS)}）")
+    if not backend_available(backend):
+        raise ImportError(f"PDF文本后端 {backend} 需要安装 {BACKENDS[backend][1]}")
+    return BACKENDS[backend][0](path)
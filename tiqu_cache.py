@@ -0,0 +1,123 @@
+"""PDF逐页词频缓存：键为 PDF内容哈希 + 页码 + 流水线版本，值为该页的词元Counter"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+DEFAULT_CACHE_FILE = "tiqu_cache.db"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_hash_memo = {}
+_hash_lock = threading.Lock()
+
+def pdf_content_hash(path, block_size=1 << 20):
+    """PDF内容的sha1；同一文件（大小和修改时间不变）只计算一次"""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _hash_lock:
+        if key in _hash_memo:
+            return _hash_memo[key]
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    with _hash_lock:
+        _hash_memo[key] = digest
+    return digest
+
+class PageCache:
+    """SQLite单文件缓存，按最近使用时间(LRU)淘汰，总大小不超过 max_bytes"""
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")  # 命令行批处理时多个进程同时写
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    pdf_hash  TEXT    NOT NULL,
+                    page      INTEGER NOT NULL,
+                    version   TEXT    NOT NULL,
+                    data      TEXT    NOT NULL,
+                    size      INTEGER NOT NULL,
+                    last_used REAL    NOT NULL,
+                    PRIMARY KEY (pdf_hash, page, version)
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_last_used ON pages(last_used)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_pages(self, pdf_hash, page_numbers, version):
+        """取出已缓存的页，返回 {页码: Counter}，并刷新它们的使用时间"""
+        found = {}
+        wanted = set(page_numbers)
+        if not wanted:
+            return found
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT page, data FROM pages WHERE pdf_hash = ? AND version = ? AND page BETWEEN ? AND ?",
+                (pdf_hash, version, min(wanted), max(wanted)))
+            for page, data in rows:
+                if page in wanted:
+                    found[page] = Counter(json.loads(data))
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE pages SET last_used = ? WHERE pdf_hash = ? AND page = ? AND version = ?",
+                    [(now, pdf_hash, page, version) for page in found])
+        return found
+
+    def put_pages(self, pdf_hash, page_counters, version):
+        """写入 {页码: Counter}，超出容量时淘汰最久未用的页"""
+        if not page_counters:
+            return
+        now = time.time()
+        rows = []
+        for page, counter in page_counters.items():
+            data = json.dumps(counter, ensure_ascii=False, separators=(",", ":"))
+            rows.append((pdf_hash, page, version, data, len(data), now))
+        with self._lock, self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 一次淘汰到容量的90%，避免每次写入都触发
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for pdf_hash, page, version, size in conn.execute(
+                "SELECT pdf_hash, page, version, size FROM pages ORDER BY last_used"):
+            doomed.append((pdf_hash, page, version))
+            freed += size
+            if freed >= target:
+                break
+        conn.executemany("DELETE FROM pages WHERE pdf_hash = ? AND page = ? AND version = ?", doomed)
+
+    def clear(self):
+        """清空全部缓存"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM pages")
+        with self._lock, self._connect() as conn:
+            conn.execute("VACUUM")
+
+    def stats(self):
+        """返回 (页数, 字节数)"""
+        with self._connect() as conn:
+            n, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+        return n, size
@@ -0,0 +1,149 @@
+"""命令行批量提取：统计目录/通配符下全部PDF的词频，按文件输出熟词表和生词翻译表（不依赖PyQt5）
+
+用法示例：
+    python tiqu_cli.py 课程资料/ -o 输出/ -j 8
+    python tiqu_cli.py "books/*.pdf" --pages 1-50 --no-translate
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from cidian_index import open_dict, open_lemma_index, resolve
+from fanyi import RATE_LIMITS, google_translate_many, set_rate_limit
+from shuci_store import load_known_words
+from tiqu_backends import BACKENDS, DEFAULT_BACKEND, open_text_doc
+from tiqu_cache import DEFAULT_CACHE_FILE, PageCache
+from tiqu_core import DEFAULT_ENGINE, DEFAULT_PROCESSES, ENGINES, extract_counter, split_known_unknown
+
+def find_pdfs(patterns):
+    """目录按 **/*.pdf 递归查找，其余按通配符展开"""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(glob.glob(os.path.join(pattern, "**", "*.pdf"), recursive=True))
+        else:
+            paths.extend(glob.glob(pattern, recursive=True))
+    return sorted(set(os.path.abspath(p) for p in paths if p.lower().endswith(".pdf")))
+
+def parse_pages(text):
+    """'1-50' -> (1, 50)；'7' -> (7, 7)"""
+    start, _, end = text.partition("-")
+    start = int(start)
+    end = int(end) if end else start
+    if start < 1 or end < start:
+        raise argparse.ArgumentTypeError(f"页码范围无效：{text}")
+    return start, end
+
+# ========== 子进程：一个进程处理一个文件 ==========
+_worker_cache = None
+
+def _init_file_worker(cache_file):
+    global _worker_cache
+    _worker_cache = PageCache(cache_file) if cache_file else None
+
+def _extract_file(pdf_path, page_range, backend=DEFAULT_BACKEND, engine=DEFAULT_ENGINE):
+    with open_text_doc(pdf_path, backend) as pdf:
+        total = pdf.page_count
+    start, end = page_range or (1, total)
+    end = min(end, total)
+    if start > end:
+        return Counter()
+    # 文件间已经并行，单个文件内不再开进程池
+    return extract_counter(pdf_path, start, end, processes=1, cache=_worker_cache, backend=backend,
+                           engine=engine)
+
+# ========== 主进程：分类、翻译、写文件 ==========
+def make_lookup(dict_file):
+    if not os.path.exists(dict_file) and not os.path.exists(os.path.splitext(dict_file)[0] + ".cidx"):
+        print(f"⚠️ 找不到词典 {dict_file}，本地释义一律为空", file=sys.stderr)
+        return lambda word: ""
+    d = open_dict(dict_file)
+    lemmas = open_lemma_index(dict_file, d)
+
+    def lookup(word):
+        _, definition = resolve(d, lemmas, word)
+        return definition or ""
+    return lookup
+
+def output_name(pdf_path, used):
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    name, n = stem, 1
+    while name in used:
+        n += 1
+        name = f"{stem}_{n}"
+    used.add(name)
+    return name
+
+def write_outputs(out_dir, name, known, unknown):
+    known_path = os.path.join(out_dir, name + "_熟词.txt")
+    with open(known_path, "w", encoding="utf-8") as f:
+        for word, freq, trans in known:
+            f.write(f"{word:<18} {freq:<4} {trans or '[本地词典无翻译]'}\n")
+    unknown_path = os.path.join(out_dir, name + "_生词翻译.txt")
+    with open(unknown_path, "w", encoding="utf-8") as f:
+        for word, freq, trans in unknown:
+            f.write(f"{word:<16} 频率:{freq:<4} 翻译:{trans}\n")
+
+def translate_missing(unknown, pool):
+    """本地词典查不到的生词按批并发在线翻译"""
+    missing = [word for word, _, trans in unknown if not trans]
+    translated = google_translate_many(missing, executor=pool)
+    return [(word, freq, trans or translated[word]) for word, freq, trans in unknown]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量统计PDF词频，输出熟词/生词翻译表")
+    parser.add_argument("inputs", nargs="+", help="PDF文件、目录或通配符")
+    parser.add_argument("-o", "--out", default="输出", help="输出目录（默认：输出）")
+    parser.add_argument("-j", "--jobs", type=int, default=DEFAULT_PROCESSES, help="并行处理的文件数")
+    parser.add_argument("--pages", type=parse_pages, help="只统计这些页，如 1-50（默认全书）")
+    parser.add_argument("--dict", default="dict.txt", help="本地词典（默认 dict.txt）")
+    parser.add_argument("--known", nargs="+", default=["46merged.txt", "shuci02.txt"], help="熟词库文件")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, choices=list(BACKENDS),
+                        help="PDF文本后端（默认 pdfplumber；pypdfium2/pymupdf 需另行安装）")
+    parser.add_argument("--engine", default=DEFAULT_ENGINE, choices=list(ENGINES),
+                        help="词频统计引擎（默认 spacy；fast 为正则分词+查表词形还原，不需要spaCy）")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_FILE, help="逐页词频缓存文件，传空串关闭")
+    parser.add_argument("--no-translate", action="store_true", help="不在线翻译，生词只用本地词典释义")
+    parser.add_argument("--qps", type=float, default=RATE_LIMITS["google"][0], help="在线翻译每秒最多请求数")
+    parser.add_argument("--burst", type=int, default=RATE_LIMITS["google"][1], help="在线翻译允许的突发请求数")
+    parser.add_argument("--translate-concurrency", type=int, default=4, help="在线翻译并发请求数（每个请求一批词）")
+    args = parser.parse_args(argv)
+
+    set_rate_limit("google", args.qps, args.burst)
+    pdfs = find_pdfs(args.inputs)
+    if not pdfs:
+        print("❌ 没有找到PDF文件", file=sys.stderr)
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+    lookup = make_lookup(args.dict)
+    known_sets = [load_known_words(path) for path in args.known]
+
+    t0 = time.perf_counter()
+    used_names = set()
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs), initializer=_init_file_worker,
+                             initargs=(args.cache,)) as pool, \
+            ThreadPoolExecutor(max_workers=args.translate_concurrency) as trans_pool:
+        futures = {pool.submit(_extract_file, path, args.pages, args.backend, args.engine): path for path in pdfs}
+        for i, fut in enumerate(as_completed(futures), 1):
+            path = futures[fut]
+            try:
+                word_counter = fut.result()
+            except Exception as e:
+                failed += 1
+                print(f"[{i}/{len(pdfs)}] ❌ {path}：{e}", file=sys.stderr)
+                continue
+            known, unknown = split_known_unknown(word_counter, known_sets, lookup)
+            if not args.no_translate:
+                unknown = translate_missing(unknown, trans_pool)
+            write_outputs(args.out, output_name(path, used_names), known, unknown)
+            print(f"[{i}/{len(pdfs)}] ✅ {os.path.basename(path)}：熟词 {len(known)}，生词 {len(unknown)}")
+    print(f"完成 {len(pdfs) - failed}/{len(pdfs)} 个文件，用时 {time.perf_counter() - t0:.1f} 秒，输出目录：{args.out}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,443 @@
+"""PDF单词提取核心（不依赖PyQt5，可在进程池子进程中运行）"""
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from tiqu_backends import DEFAULT_BACKEND, open_text_doc
+from tiqu_cache import pdf_content_hash
+from tiqu_fast import FastLemmaCounter
+from ziyuan import get_extract_resources, get_fast_resources
+
+# ========== 并行参数 ==========
+DEFAULT_PROCESSES = max(1, (os.cpu_count() or 1) - 1)  # 留一个核给界面
+PARALLEL_MIN_PAGES = 16    # 页数太少时启动进程+加载spaCy反而更慢
+CHUNKS_PER_PROCESS = 4     # 每个进程分到的块数，块越小进度条越平滑
+MAX_CHUNK_PAGES = 8        # 每块最多页数，块越小中间结果回传越及时
+IN_FLIGHT_PER_PROCESS = 2  # 每个进程最多预先派发的块数，暂停/取消时最多再算完这些块
+
+# ========== spaCy 流水线参数 ==========
+# 统计规则或模型组件有变化时改这个版本号，旧的逐页缓存自动失效
+PIPELINE_VERSION = "en_core_web_sm/count-v1"
+# 词频统计只读 is_alpha / is_ascii / lemma_，词元只依赖 tagger + attribute_ruler + lemmatizer，
+# 句法分析和命名实体识别完全用不到，直接不加载
+COUNT_EXCLUDE = ["parser", "ner", "senter"]
+PIPE_BATCH_SIZE = 32       # nlp.pipe 每批页数
+PIPE_N_PROCESS = 1         # nlp.pipe 自带的进程数（进程池模式下固定为1）
+STREAM_BATCH_SIZE = 4      # 需要逐页回传中间结果时的批大小，批太大首批结果要等很久
+
+# ========== 统计引擎 ==========
+# spacy：词性标注+词形还原，准确但慢；fast：正则分词+查表词形还原，不加载spaCy
+ENGINES = {
+    "spacy": "spaCy（准确）",
+    "fast": "快速（正则+查表，不需要spaCy）",
+}
+DEFAULT_ENGINE = "spacy"
+FAST_PIPELINE_VERSION = "regex-lookup/count-v1"
+ENGINE_RESOURCES = {"spacy": get_extract_resources, "fast": get_fast_resources}
+
+# ========== 协作式取消/暂停 ==========
+class ExtractCancelled(Exception):
+    """任务被取消"""
+
+class JobControl:
+    """提取/翻译任务的暂停与取消标志，由任务在页与页、词与词之间主动检查"""
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set()  # 暂停中的任务也要醒来退出
+
+    def pause(self):
+        if not self._cancelled.is_set():
+            self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def wait(self):
+        """暂停时阻塞到继续或取消；返回是否应继续执行"""
+        self._running.wait()
+        return not self._cancelled.is_set()
+
+    def checkpoint(self):
+        """检查点：暂停时阻塞，已取消则抛出 ExtractCancelled"""
+        if not self.wait():
+            raise ExtractCancelled()
+
+# ========== 分阶段计时与计数 ==========
+STAGE_LABELS = (
+    ("cache_get", "读页面缓存"),
+    ("load_models", "加载模型/词表"),
+    ("extract_text", "抽取文本 extract_text"),
+    ("nlp", "分词/词形还原"),
+    ("filter", "词表/停用词过滤"),
+    ("cache_put", "写页面缓存"),
+    ("split", "熟词/生词拆分+本地释义"),
+    ("translate", "在线翻译（墙钟）"),
+    ("translate_calls", "在线翻译（各请求累计）"),
+    ("total", "提取总耗时（墙钟）"),
+)
+COUNT_LABELS = (
+    ("pages", "页数"),
+    ("pages_cached", "缓存命中页"),
+    ("pages_empty", "无文本页"),
+    ("tokens", "词元"),
+    ("lemmas_kept", "保留词元"),
+    ("unique_words", "不同单词"),
+    ("known_words", "熟词"),
+    ("unknown_words", "生词"),
+    ("translations", "在线翻译词数"),
+    ("translation_cache_hits", "翻译缓存命中"),
+    ("translate_batches", "翻译请求数"),
+    ("translation_failures", "翻译失败"),
+)
+
+class ExtractStats:
+    """一次提取的分阶段耗时（秒）和计数；只含Counter，可从子进程pickle回来合并"""
+
+    def __init__(self):
+        self.seconds = Counter()
+        self.counts = Counter()
+
+    def add(self, stage, seconds):
+        self.seconds[stage] += seconds
+
+    @contextmanager
+    def timer(self, stage):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[stage] += time.perf_counter() - t0
+
+    def merge(self, other):
+        self.seconds.update(other.seconds)
+        self.counts.update(other.counts)
+        return self
+
+    def to_dict(self):
+        return {"seconds": {k: round(v, 6) for k, v in self.seconds.items()}, "counts": dict(self.counts)}
+
+    def to_json(self, path, **extra):
+        """写成JSON，extra 为附加信息（文件名、页码范围等）"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(dict(extra, **self.to_dict()), f, ensure_ascii=False, indent=2)
+
+    def summary_lines(self):
+        """诊断面板用的文本行；多进程时各阶段为各进程累计，可能超过总墙钟时间"""
+        total = self.seconds.get("total") or sum(self.seconds.values()) or 1
+        lines = []
+        for stage, label in STAGE_LABELS:
+            if stage in self.seconds:
+                sec = self.seconds[stage]
+                lines.append(f"{label:<22} {sec * 1000:10.1f} ms  {sec / total:6.1%}")
+        counts = [f"{label} {self.counts[key]}" for key, label in COUNT_LABELS if key in self.counts]
+        if counts:
+            lines.append("，".join(counts))
+        return lines
+
+# ========== 子进程资源（每个进程只加载一次） ==========
+_nlp = None
+_english_vocab = None
+_stop_words = None
+_open_pdf_key = None
+_open_pdf = None
+
+def load_count_nlp(model="en_core_web_sm"):
+    """加载只含词频统计所需组件的spaCy流水线"""
+    import spacy
+    return spacy.load(model, exclude=COUNT_EXCLUDE)
+
+def _init_worker(engine=DEFAULT_ENGINE):
+    """进程池初始化：每个子进程只加载一次统计引擎和词表"""
+    global _nlp, _english_vocab, _stop_words
+    _nlp, _english_vocab, _stop_words = ENGINE_RESOURCES[engine]()
+
+def _get_pdf(pdf_path, backend=DEFAULT_BACKEND):
+    """子进程内复用同一个已打开的PDF，换文件或换后端时才重新打开"""
+    global _open_pdf_key, _open_pdf
+    if _open_pdf_key != (pdf_path, backend):
+        if _open_pdf is not None:
+            _open_pdf.close()
+        _open_pdf = open_text_doc(pdf_path, backend)
+        _open_pdf_key = (pdf_path, backend)
+    return _open_pdf
+
+def cache_version(backend=DEFAULT_BACKEND, engine=DEFAULT_ENGINE):
+    """逐页缓存的版本键：不同文本后端、不同统计引擎的结果各自缓存；默认组合沿用原来的键"""
+    version = PIPELINE_VERSION if engine == DEFAULT_ENGINE else FAST_PIPELINE_VERSION
+    return version if backend == DEFAULT_BACKEND else f"{version}/{backend}"
+
+def count_lemmas(doc, english_vocab, stop_words, counter):
+    """把一页spaCy结果中的有效词元计入counter"""
+    for token in doc:
+        if token.is_alpha and token.is_ascii and len(token) > 1:
+            lemma = token.lemma_.lower()
+            if lemma in english_vocab and lemma not in stop_words:
+                counter[lemma] += 1
+    return counter
+
+def count_texts(nlp, texts, english_vocab, stop_words, counter=None,
+                batch_size=PIPE_BATCH_SIZE, n_process=PIPE_N_PROCESS):
+    """用 nlp.pipe 批量处理多页文本并统计词频"""
+    if counter is None:
+        counter = Counter()
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+        count_lemmas(doc, english_vocab, stop_words, counter)
+    return counter
+
+def iter_page_texts(pdf, page_numbers, on_progress=None, control=None, stats=None):
+    """逐页抽取文本，产出 (文本, 页码) 供 nlp.pipe(as_tuples=True) 流式消费，无文本的页跳过
+
+    pdf 为 tiqu_backends.open_text_doc 打开的文档。
+    """
+    total = len(page_numbers)
+    for i, n in enumerate(page_numbers):
+        if control is not None:
+            control.checkpoint()
+        t0 = time.perf_counter()
+        text = pdf.page_text(n)
+        if stats is not None:
+            stats.add("extract_text", time.perf_counter() - t0)
+            if not text:
+                stats.counts["pages_empty"] += 1
+        if on_progress:
+            on_progress(int((i + 1) / total * 100))
+        if text:
+            yield text, n
+
+def count_pages(nlp, pdf, page_numbers, english_vocab, stop_words,
+                batch_size=PIPE_BATCH_SIZE, n_process=PIPE_N_PROCESS, on_progress=None, on_page=None,
+                control=None, stats=None):
+    """逐页统计词频，返回 {页码: Counter}（无文本的页也有空Counter，便于缓存）
+
+    on_page(页码, Counter) 在每页统计完成后立即调用，用于向界面流式回传中间结果。
+    control 为 JobControl，每页开始前检查一次暂停/取消。
+    stats 为 ExtractStats：抽取文本和过滤分别计时，nlp.pipe 与抽取交错执行，其耗时取循环总时间减去其余各项。
+    nlp 为 FastLemmaCounter 时走快速引擎，不做批处理。
+    """
+    if stats is None:
+        stats = ExtractStats()
+    if isinstance(nlp, FastLemmaCounter):
+        return count_pages_fast(nlp, pdf, page_numbers, on_progress, on_page, control, stats)
+    page_counters = {n: Counter() for n in page_numbers}
+    texts = iter_page_texts(pdf, page_numbers, on_progress, control, stats)
+    extract_before = stats.seconds["extract_text"]
+    other = 0.0
+    t_loop = time.perf_counter()
+    for doc, n in nlp.pipe(texts, as_tuples=True, batch_size=batch_size, n_process=n_process):
+        t0 = time.perf_counter()
+        counter = count_lemmas(doc, english_vocab, stop_words, page_counters[n])
+        t1 = time.perf_counter()
+        stats.add("filter", t1 - t0)
+        stats.counts["tokens"] += len(doc)
+        stats.counts["lemmas_kept"] += sum(counter.values())
+        if on_page:
+            on_page(n, counter)
+        other += time.perf_counter() - t0
+    loop = time.perf_counter() - t_loop
+    stats.add("nlp", max(0.0, loop - other - (stats.seconds["extract_text"] - extract_before)))
+    return page_counters
+
+def count_pages_fast(counter_engine, pdf, page_numbers, on_progress=None, on_page=None, control=None, stats=None):
+    """快速引擎逐页统计，参数和返回值同 count_pages；分词和查表还原合在一起计入 nlp 阶段"""
+    if stats is None:
+        stats = ExtractStats()
+    page_counters = {n: Counter() for n in page_numbers}
+    for text, n in iter_page_texts(pdf, page_numbers, on_progress, control, stats):
+        t0 = time.perf_counter()
+        counter, n_tokens = counter_engine.count_text(text, page_counters[n])
+        stats.add("nlp", time.perf_counter() - t0)
+        stats.counts["tokens"] += n_tokens
+        stats.counts["lemmas_kept"] += sum(counter.values())
+        if on_page:
+            on_page(n, counter)
+    return page_counters
+
+def merge_counters(page_counters):
+    """把 {页码: Counter} 合并成一个总Counter"""
+    word_counter = Counter()
+    for counter in page_counters.values():
+        word_counter.update(counter)
+    return word_counter
+
+def split_pages(page_numbers, n_chunks):
+    """把页码列表切成连续的若干块"""
+    pages = list(page_numbers)
+    n_chunks = max(1, min(n_chunks, len(pages)))
+    size, rest = divmod(len(pages), n_chunks)
+    chunks, pos = [], 0
+    for i in range(n_chunks):
+        step = size + (1 if i < rest else 0)
+        chunks.append(pages[pos:pos + step])
+        pos += step
+    return chunks
+
+def _extract_chunk(pdf_path, page_numbers, backend=DEFAULT_BACKEND):
+    """子进程任务：统计一块页码的词频，返回 ({页码: Counter}, ExtractStats)"""
+    pdf = _get_pdf(pdf_path, backend)
+    stats = ExtractStats()
+    page_counters = count_pages(_nlp, pdf, page_numbers, _english_vocab, _stop_words, n_process=1, stats=stats)
+    return page_counters, stats
+
+def use_parallel(n_pages, processes):
+    """是否值得为这么多页启用进程池"""
+    return processes > 1 and n_pages >= PARALLEL_MIN_PAGES
+
+def parallel_page_counters(pdf_path, page_numbers, processes=DEFAULT_PROCESSES, on_progress=None, on_pages=None,
+                           control=None, stats=None, backend=DEFAULT_BACKEND, engine=DEFAULT_ENGINE):
+    """多进程逐页提取：按块分发页码，各进程自行打开PDF，返回 {页码: Counter}
+
+    每完成一块就调用 on_pages({页码: Counter})。块不是一次全部派发，而是每个进程最多预派
+    IN_FLIGHT_PER_PROCESS 块，完成一块再派一块，派发前检查 control：
+    暂停时不再派发新块，取消时丢弃未开始的块并立即返回（已在子进程里算的块最多算完这一块）。
+    各块的 ExtractStats 合并进 stats（各阶段耗时为所有进程累计）。
+    engine 为统计引擎名，子进程初始化时按它加载资源。
+    """
+    total = len(page_numbers)
+    n_chunks = max(processes * CHUNKS_PER_PROCESS, -(-total // MAX_CHUNK_PAGES))
+    chunks = iter(split_pages(page_numbers, n_chunks))
+    n_workers = min(processes, n_chunks, total)
+    page_counters = {}
+    pool = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(engine,))
+    cancelled = False
+    try:
+        in_flight = set()
+
+        def submit_next():
+            if control is not None:
+                control.checkpoint()
+            chunk = next(chunks, None)
+            if chunk is not None:
+                in_flight.add(pool.submit(_extract_chunk, pdf_path, chunk, backend))
+
+        for _ in range(n_workers * IN_FLIGHT_PER_PROCESS):
+            submit_next()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                in_flight.discard(fut)
+                part, part_stats = fut.result()
+                if stats is not None:
+                    stats.merge(part_stats)
+                page_counters.update(part)
+                if on_pages:
+                    on_pages(part)
+                if on_progress:
+                    on_progress(int(len(page_counters) / total * 100))
+            for _ in done:
+                submit_next()
+    except ExtractCancelled:
+        cancelled = True
+        raise
+    finally:
+        pool.shutdown(wait=not cancelled, cancel_futures=True)
+    return page_counters
+
+def parallel_extract(pdf_path, start_page, end_page, processes=DEFAULT_PROCESSES, on_progress=None):
+    """多进程提取页码范围的词频，返回合并后的Counter"""
+    page_numbers = list(range(start_page, end_page + 1))
+    return merge_counters(parallel_page_counters(pdf_path, page_numbers, processes, on_progress))
+
+def extract_counter(pdf_path, start_page, end_page, resources=None, processes=DEFAULT_PROCESSES,
+                    cache=None, on_progress=None, on_pages=None, control=None, stats=None,
+                    backend=DEFAULT_BACKEND, engine=DEFAULT_ENGINE):
+    """提取页码范围的词频：先取缓存，只对没见过的页抽取文本+spaCy，并写回缓存
+
+    resources 为返回 (nlp, english_vocab, stop_words) 的函数，只在单进程提取未命中的页时才调用，
+    全部命中缓存或走进程池时主进程不必加载spaCy；不传时按 engine 取 ENGINE_RESOURCES 中的函数。
+    on_pages({页码: Counter}) 用于流式回传：命中缓存的页先一次性回传，之后每统计完一页（进程池为一块）回传一次，
+    各次回传的页互不重复，累加起来即最终结果。
+    control 为 JobControl：取消时抛出 ExtractCancelled，已统计完的页照样写入缓存。
+    stats 为 ExtractStats，记录各阶段耗时和页数/词元/缓存命中等计数。
+    backend 为 tiqu_backends 中的文本后端名，engine 为 ENGINES 中的统计引擎名，两者都是缓存键的一部分。
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"未知的统计引擎：{engine}（可选：{', '.join(ENGINES)}）")
+    if resources is None:
+        resources = ENGINE_RESOURCES[engine]
+    if stats is None:
+        stats = ExtractStats()
+    t_start = time.perf_counter()
+    page_numbers = list(range(start_page, end_page + 1))
+    total = len(page_numbers)
+    page_counters = {}
+    pdf_hash = None
+    version = cache_version(backend, engine)
+    if cache is not None:
+        with stats.timer("cache_get"):
+            pdf_hash = pdf_content_hash(pdf_path)
+            page_counters.update(cache.get_pages(pdf_hash, page_numbers, version))
+    missing = [n for n in page_numbers if n not in page_counters]
+    n_cached = total - len(missing)
+    stats.counts["pages"] += total
+    stats.counts["pages_cached"] += n_cached
+    if on_pages and page_counters:
+        on_pages(dict(page_counters))
+    if on_progress and n_cached:
+        on_progress(int(n_cached / total * 100))
+
+    def missing_progress(percent):
+        if on_progress:
+            on_progress(int((n_cached + percent / 100 * len(missing)) / total * 100))
+
+    if missing:
+        fresh = {}
+
+        def pages_done(pages):
+            fresh.update(pages)
+            if on_pages:
+                on_pages(pages)
+
+        try:
+            if use_parallel(len(missing), processes):
+                fresh.update(parallel_page_counters(pdf_path, missing, processes, missing_progress,
+                                                    pages_done, control, stats, backend, engine))
+            else:
+                with stats.timer("load_models"):
+                    nlp, english_vocab, stop_words = resources()
+                batch_size = STREAM_BATCH_SIZE if on_pages else PIPE_BATCH_SIZE
+                with open_text_doc(pdf_path, backend) as pdf:
+                    fresh.update(count_pages(nlp, pdf, missing, english_vocab, stop_words, batch_size=batch_size,
+                                             on_progress=missing_progress,
+                                             on_page=lambda n, counter: pages_done({n: counter}),
+                                             control=control, stats=stats))
+        finally:
+            # 中途取消或出错时，已统计完的页也写入缓存，下次不必重算
+            if cache is not None:
+                with stats.timer("cache_put"):
+                    cache.put_pages(pdf_hash, fresh, version)
+            stats.add("total", time.perf_counter() - t_start)
+        page_counters.update(fresh)
+    else:
+        stats.add("total", time.perf_counter() - t_start)
+    word_counter = merge_counters(page_counters)
+    stats.counts["unique_words"] = len(word_counter)
+    return word_counter
+
+def split_known_unknown(word_counter, known_sets, lookup):
+    """按字典序拆分熟词/生词，返回 (known, unknown)，元素为 (词, 频率, 本地释义)，本地查不到时释义为空串"""
+    known, unknown = [], []
+    for word in sorted(word_counter):
+        row = (word, word_counter[word], lookup(word))
+        if any(word in words for words in known_sets):
+            known.append(row)
+        else:
+            unknown.append(row)
+    return known, unknown
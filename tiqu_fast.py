@@ -0,0 +1,82 @@
+"""不依赖spaCy的快速词频统计：正则分词 + 查表词形还原 + 预先算好的"可计入词元"集合
+
+与 spaCy 引擎的规则对应：只取纯ASCII字母、长度>1的词，词元须在英文词表中且不是停用词。
+词形还原按顺序：不规则变化表（WordNet例外表、spacy-lookups-data，装了才有）-> 本身就在词表中 ->
+按英语构词规则逆推候选原形，取第一个在词表中的。每个不同的词只推一次，结果记在查表里。
+"""
+import re
+from collections import Counter
+
+from cidian_index import irregular_lemma_pairs
+
+# 前后不能紧挨其他字母/数字/下划线：abc123、naïve 这类 spaCy 判为非纯字母的词元整个跳过
+TOKEN_RE = re.compile(r"(?<!\w)[A-Za-z]{2,}(?!\w)")
+_VOWELS = set("aeiou")
+
+def base_candidates(word):
+    """按屈折规则逆推可能的原形（不含 word 本身），常见的在前"""
+    cands = []
+    n = len(word)
+    if word.endswith("ies") and n > 4:
+        cands.append(word[:-3] + "y")
+    if word.endswith("es") and n > 3:
+        cands.append(word[:-2])
+    if word.endswith("s") and not word.endswith("ss") and n > 3:
+        cands.append(word[:-1])
+    for suffix in ("ed", "ing", "er", "est"):
+        if not word.endswith(suffix) or n - len(suffix) < 2:
+            continue
+        stem = word[:-len(suffix)]
+        if stem.endswith("i") and suffix != "ing":
+            cands.append(stem[:-1] + "y")           # carried -> carry, happier -> happy
+        if suffix == "ing" and stem.endswith("y") and len(stem) > 2:
+            cands.append(stem[:-1] + "ie")          # lying -> lie
+        cands.append(stem)                          # walked -> walk
+        cands.append(stem + "e")                    # used -> use, making -> make
+        if len(stem) > 2 and stem[-1] == stem[-2] and stem[-1] not in _VOWELS:
+            cands.append(stem[:-1])                 # stopped -> stop, bigger -> big
+    return cands
+
+class FastLemmaCounter:
+    """快速引擎：count_text(text, counter) 把一页文本的有效词元计入 counter"""
+
+    def __init__(self, english_vocab, stop_words, irregular=None):
+        self.admissible = frozenset(w for w in english_vocab if w not in stop_words)
+        self.stop_words = frozenset(stop_words)
+        if irregular is None:
+            irregular = irregular_lemma_pairs()
+        # 小写形式 -> 可计入的词元；None 表示不计入（如 was -> be 是停用词）
+        # 原形不在词表里的不规则条目不预填，留给 lemma_of 按普通词处理
+        self.table = {}
+        for form, lemma in irregular:
+            if form in self.table or not form.isalpha():
+                continue
+            if lemma in self.admissible:
+                self.table[form] = lemma
+            elif lemma in self.stop_words:
+                self.table[form] = None
+
+    def lemma_of(self, word):
+        """小写词 -> 可计入的词元或None，结果写回查表"""
+        table = self.table
+        if word in table:
+            return table[word]
+        if word in self.admissible:
+            lemma = word
+        elif word in self.stop_words:
+            lemma = None
+        else:
+            lemma = next((c for c in base_candidates(word) if c in self.admissible), None)
+        table[word] = lemma
+        return lemma
+
+    def count_text(self, text, counter=None):
+        """统计一段文本，返回 (counter, 参与判断的词数)"""
+        if counter is None:
+            counter = Counter()
+        words = TOKEN_RE.findall(text.lower())
+        table = self.table
+        lemma_of = self.lemma_of
+        lemmas = [table[w] if w in table else lemma_of(w) for w in words]
+        counter.update(filter(None, lemmas))
+        return counter, len(words)
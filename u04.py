@@ -1,112 +1,316 @@
 import sys, os, time
-import pdfplumber
-import spacy
-import nltk
+_T0 = time.perf_counter()  # 首屏计时起点
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import Counter
-from nltk.corpus import words as nltk_words
-from nltk.corpus import stopwords
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QPushButton, QLabel, QVBoxLayout,
     QWidget, QFileDialog, QTextEdit, QMessageBox, QProgressBar,
-    QHBoxLayout, QLineEdit, QDialog, QTabWidget, QListWidget,
-    QListWidgetItem
+    QHBoxLayout, QLineEdit, QDialog, QTabWidget, QCompleter, QTableView,
+    QHeaderView, QAbstractItemView, QComboBox, QCheckBox
 )
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QUrl
-from PyQt5.QtWebEngineWidgets import QWebEngineView
-from googletrans import Translator
-import urllib.parse
+from PyQt5.QtCore import (Qt, QThread, pyqtSignal, QTimer, QStringListModel, QAbstractTableModel,
+                          QModelIndex)
+from cidian_index import open_dict, open_fuzzy, open_lemma_index, resolve
+from fanyi import cached_translate, fetch_google, google_translate_batch_counted, make_batches, offline_reason, set_offline
+from tiqu_core import (DEFAULT_ENGINE, DEFAULT_PROCESSES, ENGINES, ExtractCancelled, ExtractStats, JobControl,
+                       extract_counter, merge_counters, split_known_unknown)
+from tiqu_backends import BACKENDS, DEFAULT_BACKEND, available_backends, open_text_doc
+from tiqu_cache import PageCache
+from shuci_store import KnownWordStore, load_known_words
+from ziyuan import report_startup
+from yibu_chaci import AsyncLookup, make_debounce_timer
 
 # ========== 资源初始化 ==========
-nltk.download('words')
-nltk.download('stopwords')
-nlp = spacy.load("en_core_web_sm")
-english_vocab = set(w.lower() for w in nltk_words.words())
-stop_words = set(stopwords.words('english'))
-translator = Translator()
+# spaCy / NLTK词表 / googletrans 由 ziyuan 在第一次提取或在线翻译时才加载，
+# 只用查词页的话这些都不会加载
 
 # ========== 词典与熟词库加载 ==========
 DICT_FILE = "dict.txt"
 SYS_KNOWN_WORDS_FILE = "46merged.txt"
 USER_KNOWN_WORDS_FILE = "shuci02.txt"  # 新增：用户成长熟词库
-
-def load_dict(file):
-    d_en2zh = {}
-    with open(file, encoding='utf-8') as f:
-        for idx, line in enumerate(f, 1):
-            line = line.strip()
-            if not line: continue
-            parts = line.split('\t', 1)
-            if len(parts) != 2: continue
-            en, zh = parts
-            en, zh = en.strip(), zh.strip()
-            if en and zh:
-                d_en2zh[en.lower()] = zh
-    return d_en2zh
-
-def load_known_words(path):
-    """加载一类熟词文件到集合"""
-    known_words = set()
-    if not os.path.exists(path):
-        return known_words
-    with open(path, encoding="utf-8") as f:
-        for line in f:
-            if not line.strip(): continue
-            word = line.strip().split()[0].lower()
-            if word:
-                known_words.add(word)
-    return known_words
-
-def save_user_known_words(new_lines):
-    """追加新熟词到用户熟词文件"""
-    with open(USER_KNOWN_WORDS_FILE, "a", encoding="utf-8") as f:
-        for line in new_lines:
-            f.write(line + "\n")
-
-def reload_user_known_words():
-    """重新读取用户成长熟词文件"""
-    return load_known_words(USER_KNOWN_WORDS_FILE)
-
-DICT = load_dict(DICT_FILE)
+EXTRACT_PROCESSES = DEFAULT_PROCESSES  # 提取用进程数，设为1即单线程逐页提取
+EXTRACT_BACKEND = DEFAULT_BACKEND      # 默认PDF文本后端，界面上可切换（见 tiqu_backends）
+EXTRACT_ENGINE = DEFAULT_ENGINE        # 默认词频统计引擎，界面上可切换为不需要spaCy的快速引擎
+PAGE_CACHE_FILE = "tiqu_cache.db"      # 逐页词频缓存（按PDF内容哈希，换名/挪位置也能命中）
+PAGE_CACHE_MAX_MB = 256
+TRANSLATE_CONCURRENCY = 4              # 生词在线翻译的并发请求数（每个请求一批词）
+STREAM_REFRESH_MS = 500                # 提取过程中熟词/生词面板的刷新间隔
+AUTOCOMPLETE_TOP_K = 12                # 查词框联想候选个数
+FUZZY_TOP_K = 5                        # 查不到时"您是不是要找"的候选个数
+
+DICT = open_dict(DICT_FILE)
+LEMMAS = None  # 屈折形式 -> 原形，由 LemmaIndexLoader 在后台打开；就绪前只查原词
 SYS_KNOWN_WORDS = load_known_words(SYS_KNOWN_WORDS_FILE)
-USER_KNOWN_WORDS = load_known_words(USER_KNOWN_WORDS_FILE)
+USER_KNOWN_WORDS = KnownWordStore(USER_KNOWN_WORDS_FILE)  # 内存索引，文件被外部修改时 refresh() 才重读
+PAGE_CACHE = PageCache(PAGE_CACHE_FILE, PAGE_CACHE_MAX_MB * 1024 * 1024)
+
+TRANSLATING = "⏳ 翻译中..."
+TRANSLATION_CANCELLED = "【翻译失败：已取消】"
+AWAIT_TRANSLATION = "[提取完成后翻译]"
 
-def google_translate(word):
-    try:
-        result = translator.translate(word, src='en', dest='zh-cn')
-        return result.text
-    except Exception as e:
-        return "【翻译失败】"
+def dict_lookup(word, default=""):
+    """查本地词典，原词查不到时按屈折形式还原后再查"""
+    _, definition = resolve(DICT, LEMMAS, word)
+    return definition if definition is not None else default
 
 # ========== PDF单词提取线程 ==========
 class ExtractWorker(QThread):
     progress = pyqtSignal(int)
-    result = pyqtSignal(Counter, str)
+    partial = pyqtSignal(Counter)  # 新统计完的若干页的词频增量，累加起来即最终结果
+    result = pyqtSignal(Counter, str, object)  # 词频, PDF路径, 本次的 ExtractStats
 
-    def __init__(self, pdf_path, start_page, end_page):
-        super().__init__()
+    def __init__(self, pdf_path, start_page, end_page, processes=EXTRACT_PROCESSES, backend=EXTRACT_BACKEND,
+                 engine=EXTRACT_ENGINE, parent=None):
+        super().__init__(parent)
         self.pdf_path = pdf_path
         self.start_page = start_page
         self.end_page = end_page
+        self.processes = processes
+        self.backend = backend
+        self.engine = engine
+        self.control = JobControl()  # 暂停/取消，在页与页之间检查
+        self.stats = ExtractStats()   # 各阶段耗时与计数，随 result 一起发给界面
+
+    def emit_partial(self, page_counters):
+        self.partial.emit(merge_counters(page_counters))
 
     def run(self):
         try:
-            word_counter = Counter()
-            with pdfplumber.open(self.pdf_path) as pdf:
-                pages = pdf.pages[self.start_page - 1 : self.end_page]
-                for i, page in enumerate(pages):
-                    text = page.extract_text()
-                    if text:
-                        doc = nlp(text)
-                        for token in doc:
-                            if token.is_alpha and token.is_ascii and len(token) > 1:
-                                lemma = token.lemma_.lower()
-                                if lemma in english_vocab and lemma not in stop_words:
-                                    word_counter[lemma] += 1
-                    self.progress.emit(int((i + 1) / len(pages) * 100))
-            self.result.emit(word_counter, self.pdf_path)
+            word_counter = extract_counter(
+                self.pdf_path, self.start_page, self.end_page,
+                None, self.processes, PAGE_CACHE, self.progress.emit, self.emit_partial,
+                self.control, self.stats, self.backend, self.engine)
+            self.result.emit(word_counter, self.pdf_path, self.stats)
+        except ExtractCancelled:
+            pass
         except Exception as e:
-            self.result.emit(Counter({"❌ 提取失败": 1}), self.pdf_path)
+            self.result.emit(Counter({"❌ 提取失败": 1}), self.pdf_path, self.stats)
+
+# ========== 生词在线翻译线程（并发请求，逐词回传） ==========
+class TranslateWorker(QThread):
+    progress = pyqtSignal(int)
+    translated = pyqtSignal(str, str)  # 单词, 翻译
+    done = pyqtSignal(object)          # 结束（含出错）时发出本次的 ExtractStats
+
+    def __init__(self, words, concurrency=TRANSLATE_CONCURRENCY, parent=None):
+        super().__init__(parent)
+        self.words = words
+        self.concurrency = concurrency
+        self.control = JobControl()  # 暂停/取消，每个词发请求前检查
+        self.stats = ExtractStats()
+
+    def stop(self):
+        self.control.cancel()
+
+    def translate_batch(self, batch):
+        """一批单词一个请求，返回 ({词: 翻译}, 请求耗时秒, 缓存命中词数)；已取消返回 (None, 0, 0)"""
+        if not self.control.wait():
+            return None, 0.0, 0
+        t0 = time.perf_counter()
+        results, cache_hits = google_translate_batch_counted(batch)
+        return results, time.perf_counter() - t0, cache_hits
+
+    def run(self):
+        try:
+            total = len(self.words)
+            n_done = 0
+            with self.stats.timer("translate"), ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                futures = [pool.submit(self.translate_batch, batch) for batch in make_batches(self.words)]
+                for fut in as_completed(futures):
+                    results, seconds, cache_hits = fut.result()
+                    if results is None or self.control.cancelled:
+                        for f in futures:
+                            f.cancel()
+                        break
+                    self.stats.add("translate_calls", seconds)
+                    self.stats.counts["translation_cache_hits"] += cache_hits
+                    if cache_hits < len(results):   # 整批命中缓存时没有发请求
+                        self.stats.counts["translate_batches"] += 1
+                        self.stats.counts["translations"] += len(results) - cache_hits
+                    for word, trans in results.items():
+                        if trans.startswith("【翻译失败"):
+                            self.stats.counts["translation_failures"] += 1
+                        self.translated.emit(word, trans)
+                    n_done += len(results)
+                    self.progress.emit(int(n_done / total * 100))
+        finally:
+            self.done.emit(self.stats)
+
+# ========== 单词表模型：(单词, 频率, 翻译, 是否勾选) 直接作为数据，视图只画可见的行 ==========
+# 排序和过滤都在模型里对Python列表做，不经过逐行回调 data() 的 QSortFilterProxyModel，几万行也只要几毫秒
+FILTER_DEBOUNCE_MS = 150   # 过滤框停止输入这么久后才真正过滤
+
+def translation_rank(trans):
+    """翻译状态排序：0 有释义，1 翻译中/待翻译，2 翻译失败/无释义"""
+    if trans in (TRANSLATING, AWAIT_TRANSLATION):
+        return 1
+    if not trans or trans.startswith("【翻译失败") or trans.startswith("[本地词典无翻译"):
+        return 2
+    return 0
+
+class WordTableModel(QAbstractTableModel):
+    COLUMNS = ("单词", "频率", "翻译")
+
+    def __init__(self, rows=(), checkable=False, parent=None):
+        super().__init__(parent)
+        self.checkable = checkable
+        self._rows = []
+        self._checked = []
+        self._visible = []          # 可见行（过滤+排序后）在 _rows 中的下标
+        self._sort_column = -1      # -1 表示保持数据原有顺序
+        self._sort_order = Qt.AscendingOrder
+        self._filter = ""
+        self.set_rows(rows)
+
+    # ------ 数据 ------
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = [list(row) for row in rows]
+        self._checked = [True] * len(self._rows)
+        self._update_visible()
+        self.endResetModel()
+
+    def rows(self):
+        return [tuple(row) for row in self._rows]
+
+    def total_count(self):
+        return len(self._rows)
+
+    def update_translations(self, updates):
+        """批量更新翻译列 {源行号: 翻译}"""
+        if not updates:
+            return
+        for row, trans in updates.items():
+            self._rows[row][2] = trans
+        if self._filter or self._sort_column == 2:
+            # 影响过滤/排序结果，重新整理可见行
+            self.layoutAboutToBeChanged.emit()
+            self._update_visible()
+            self.layoutChanged.emit()
+        elif self._visible:
+            self.dataChanged.emit(self.index(0, 2), self.index(len(self._visible) - 1, 2), [Qt.DisplayRole])
+
+    # ------ 排序/过滤 ------
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self._sort_column = column
+        self._sort_order = order
+        self._update_visible()
+        self.layoutChanged.emit()
+
+    def set_filter(self, text):
+        text = text.strip().lower()
+        if text == self._filter:
+            return
+        self.beginResetModel()
+        self._filter = text
+        self._update_visible()
+        self.endResetModel()
+
+    def _update_visible(self):
+        rows = self._rows
+        needle = self._filter
+        if needle:
+            visible = [i for i, (word, _, trans) in enumerate(rows) if needle in word or needle in trans.lower()]
+        else:
+            visible = list(range(len(rows)))
+        col = self._sort_column
+        if col == 0:
+            key = lambda i: rows[i][0]
+        elif col == 1:
+            key = lambda i: rows[i][1]
+        elif col == 2:
+            key = lambda i: (translation_rank(rows[i][2]), rows[i][2])
+        else:
+            key = None
+        if key is not None:
+            visible.sort(key=key, reverse=self._sort_order == Qt.DescendingOrder)
+        self._visible = visible
+
+    def visible_source_rows(self):
+        return list(self._visible)
+
+    # ------ 勾选 ------
+    def set_checked(self, rows, checked):
+        """批量勾选/取消（源行号），只发一次 dataChanged"""
+        for row in rows:
+            self._checked[row] = checked
+        if self._visible:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._visible) - 1, 0), [Qt.CheckStateRole])
+
+    def checked_rows(self):
+        return [tuple(row) for row, checked in zip(self._rows, self._checked) if checked]
+
+    # ------ Qt 接口 ------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._visible)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = self._visible[index.row()], index.column()
+        if role == Qt.DisplayRole:
+            return self._rows[row][col]
+        if role == Qt.CheckStateRole and self.checkable and col == 0:
+            return Qt.Checked if self._checked[row] else Qt.Unchecked
+        if role == Qt.TextAlignmentRole and col == 1:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if self.checkable and index.column() == 0:
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role == Qt.CheckStateRole and self.checkable and index.column() == 0:
+            self._checked[self._visible[index.row()]] = value == Qt.Checked
+            self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+            return True
+        return False
+
+def make_word_table(model, parent=None):
+    """单词表视图：行高固定，大表格只绘制可见行；点表头按该列排序"""
+    view = QTableView(parent)
+    view.setModel(model)
+    view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)  # 初始保持数据原有顺序，不排序
+    view.setSortingEnabled(True)
+    view.setSelectionBehavior(QAbstractItemView.SelectRows)
+    view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    view.setWordWrap(False)
+    view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    view.verticalHeader().setDefaultSectionSize(22)
+    view.verticalHeader().setVisible(False)
+    header = view.horizontalHeader()
+    header.setSectionResizeMode(0, QHeaderView.Interactive)
+    header.setSectionResizeMode(1, QHeaderView.ResizeToContents)
+    header.setStretchLastSection(True)
+    view.setColumnWidth(0, 180)
+    return view
+
+class FilterEdit(QLineEdit):
+    """过滤输入框：停止输入 FILTER_DEBOUNCE_MS 后才发出 filter_changed"""
+    filter_changed = pyqtSignal(str)
+
+    def __init__(self, placeholder="", parent=None):
+        super().__init__(parent)
+        self.setPlaceholderText(placeholder)
+        self.setClearButtonEnabled(True)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(FILTER_DEBOUNCE_MS)
+        self._timer.timeout.connect(lambda: self.filter_changed.emit(self.text()))
+        self.textChanged.connect(self._timer.start)
 
 # ========== 生词保存对话框：支持保存txt、同步加入熟词库 ==========
 class SaveUnknownWordsDialog(QDialog):
@@ -114,16 +318,17 @@ class SaveUnknownWordsDialog(QDialog):
         super().__init__(parent)
         self.setWindowTitle("选择要保存的生词/同步加入新熟词库")
         self.setMinimumWidth(650)
+        self.resize(700, 600)
         vbox = QVBoxLayout(self)
         label = QLabel("请勾选要保存的生词（勾选=加入熟词库shuci02.txt，下次自动识别为熟词）：")
         vbox.addWidget(label)
 
-        self.list_widget = QListWidget(self)
-        for word, freq, trans in unknown_word_list:
-            item = QListWidgetItem(f"{word:<16} 频率:{freq:<4} 翻译:{trans}")
-            item.setCheckState(Qt.Checked)
-            self.list_widget.addItem(item)
-        vbox.addWidget(self.list_widget)
+        self.filter_edit = FilterEdit("过滤单词或翻译…（全选/全不选只作用于过滤后的行）", self)
+        vbox.addWidget(self.filter_edit)
+
+        self.model = WordTableModel(unknown_word_list, checkable=True, parent=self)
+        self.view = make_word_table(self.model, self)
+        vbox.addWidget(self.view)
 
         hbox = QHBoxLayout()
         btn_all = QPushButton("全选")
@@ -137,40 +342,23 @@ class SaveUnknownWordsDialog(QDialog):
         hbox.addWidget(btn_cancel)
         vbox.addLayout(hbox)
 
+        self.filter_edit.filter_changed.connect(self.model.set_filter)
         btn_all.clicked.connect(self.check_all)
         btn_none.clicked.connect(self.uncheck_all)
         btn_save.clicked.connect(self.accept)
         btn_cancel.clicked.connect(self.reject)
 
     def check_all(self):
-        for i in range(self.list_widget.count()):
-            self.list_widget.item(i).setCheckState(Qt.Checked)
+        self.model.set_checked(self.model.visible_source_rows(), True)
     def uncheck_all(self):
-        for i in range(self.list_widget.count()):
-            self.list_widget.item(i).setCheckState(Qt.Unchecked)
+        self.model.set_checked(self.model.visible_source_rows(), False)
     def get_selected_words(self):
-        selected = []
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item.checkState() == Qt.Checked:
-                selected.append(item.text())
-        return selected
+        return [f"{word:<16} 频率:{freq:<4} 翻译:{trans}" for word, freq, trans in self.model.checked_rows()]
 
     def get_selected_word_pairs(self):
-        """返回勾选的单词及其翻译，用于加入熟词库"""
-        selected = []
-        for i in range(self.list_widget.count()):
-            item = self.list_widget.item(i)
-            if item.checkState() == Qt.Checked:
-                content = item.text()
-                word = content.split()[0]
-                # 解析翻译部分
-                try:
-                    trans = content.split("翻译:")[1].strip()
-                except Exception:
-                    trans = ""
-                selected.append((word, trans))
-        return selected
+        """返回勾选的单词及其翻译，用于加入熟词库；还没翻译完的跳过，翻译失败的只记单词不记占位文字"""
+        return [(word, trans if translation_rank(trans) == 0 else "")
+                for word, _, trans in self.model.checked_rows() if translation_rank(trans) != 1]
 
 # ========== PDF 单词提取/生词翻译界面 ==========
 class PDFWordExtractor(QWidget):
@@ -180,7 +368,9 @@ class PDFWordExtractor(QWidget):
             QWidget { background-color: #1e1e1e; color: #ffffff; font-family: 'Segoe UI'; font-size: 10.5pt; }
             QPushButton { background-color: #3A99D8; color: white; border-radius: 5px; padding: 6px; }
             QPushButton:hover { background-color: #5FB3E7; }
-            QTextEdit { background-color: #282c34; border: 1px solid #444; color: #f8f8f2; font-family: Consolas; font-size: 10pt; }
+            QTableView { background-color: #282c34; border: 1px solid #444; color: #f8f8f2; gridline-color: #3a3f4b; font-family: Consolas; font-size: 10pt; }
+            QHeaderView::section { background-color: #2e2e2e; color: #cccccc; border: none; padding: 3px; }
+            QTextEdit { background-color: #282c34; border: 1px solid #444; color: #b0bec5; font-family: Consolas; font-size: 9pt; }
             QLineEdit { background-color: #2e2e2e; border: 1px solid #555; border-radius: 4px; padding: 4px; color: white; }
             QProgressBar { border: 1px solid #555; border-radius: 5px; text-align: center; background-color: #2e2e2e; color: white; }
             QProgressBar::chunk { background-color: #5CB85C; border-radius: 5px; }
@@ -195,80 +385,167 @@ class PDFWordExtractor(QWidget):
         self.extract_button = QPushButton("提取并统计词频")
         self.save_button = QPushButton("保存生词（可选）")
         self.save_button.setEnabled(False)
+        self.clear_cache_button = QPushButton("清空页面缓存")
+        self.pause_button = QPushButton("⏸ 暂停")
+        self.cancel_button = QPushButton("⏹ 取消")
         self.progress_bar = QProgressBar()
         self.progress_bar.setValue(0)
         self.progress_bar.setTextVisible(True)
         self.trans_progress = QProgressBar()
         self.trans_progress.setVisible(False)
 
-        # ------ 左右分栏（加标题和计数） ------
+        # ------ 左右分栏（加标题和计数）：虚拟表格，点表头按单词/频率/翻译状态排序 ------
+        self.status_label = QLabel()
+        self.status_label.setWordWrap(True)
+        self.filter_edit = FilterEdit("过滤单词或翻译（同时作用于熟词和生词）…")
+        self.count_suffix = ""
+
         self.left_label = QLabel()
         self.left_label.setStyleSheet("color:#81c784;font-size:14px;font-weight:bold;padding:2px;")
-        self.known_edit = QTextEdit()
-        self.known_edit.setReadOnly(True)
-        self.known_edit.setPlaceholderText("熟词（含翻译）")
+        self.known_model = WordTableModel(parent=self)
+        self.known_view = make_word_table(self.known_model, self)
         left_vbox = QVBoxLayout()
         left_vbox.addWidget(self.left_label)
-        left_vbox.addWidget(self.known_edit)
+        left_vbox.addWidget(self.known_view)
 
         self.right_label = QLabel()
         self.right_label.setStyleSheet("color:#64b5f6;font-size:14px;font-weight:bold;padding:2px;")
-        self.unknown_edit = QTextEdit()
-        self.unknown_edit.setReadOnly(True)
-        self.unknown_edit.setPlaceholderText("生词（含翻译）")
+        self.unknown_model = WordTableModel(parent=self)
+        self.unknown_view = make_word_table(self.unknown_model, self)
         right_vbox = QVBoxLayout()
         right_vbox.addWidget(self.right_label)
-        right_vbox.addWidget(self.unknown_edit)
+        right_vbox.addWidget(self.unknown_view)
 
         text_layout = QHBoxLayout()
         text_layout.addLayout(left_vbox, 1)
         text_layout.addLayout(right_vbox, 1)
 
+        # ------ 诊断面板：每次提取后显示各阶段耗时与计数，可导出JSON ------
+        self.diag_edit = QTextEdit()
+        self.diag_edit.setReadOnly(True)
+        self.diag_edit.setMaximumHeight(140)
+        self.diag_edit.setPlaceholderText("诊断：每次提取后显示各阶段耗时与计数")
+        self.export_stats_button = QPushButton("导出统计JSON")
+        self.export_stats_button.setEnabled(False)
+        diag_layout = QHBoxLayout()
+        diag_layout.addWidget(self.diag_edit, 1)
+        diag_layout.addWidget(self.export_stats_button, 0, Qt.AlignTop)
+
         # 页码输入区
         page_layout = QHBoxLayout()
         page_layout.addWidget(self.start_page_input)
         page_layout.addWidget(self.end_page_input)
+        # 文本后端：只列出当前环境装了依赖的
+        self.backend_combo = QComboBox()
+        for name in available_backends() or [EXTRACT_BACKEND]:
+            self.backend_combo.addItem(BACKENDS[name][2], name)
+        self.backend_combo.setCurrentIndex(max(0, self.backend_combo.findData(EXTRACT_BACKEND)))
+        page_layout.addWidget(self.backend_combo)
+        # 统计引擎：spaCy 准确，快速引擎不加载spaCy，结果略有出入
+        self.engine_combo = QComboBox()
+        for name, label in ENGINES.items():
+            self.engine_combo.addItem(label, name)
+        self.engine_combo.setCurrentIndex(max(0, self.engine_combo.findData(EXTRACT_ENGINE)))
+        page_layout.addWidget(self.engine_combo)
 
         layout = QVBoxLayout()
         layout.addWidget(self.label)
         layout.addWidget(self.select_button)
         layout.addLayout(page_layout)
         layout.addWidget(self.extract_button)
+        job_layout = QHBoxLayout()
+        job_layout.addWidget(self.pause_button)
+        job_layout.addWidget(self.cancel_button)
+        layout.addLayout(job_layout)
         layout.addWidget(self.save_button)
+        layout.addWidget(self.clear_cache_button)
         layout.addWidget(self.trans_progress)
         layout.addWidget(self.progress_bar)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.filter_edit)
         layout.addLayout(text_layout)
+        layout.addLayout(diag_layout)
         self.setLayout(layout)
 
         self.select_button.clicked.connect(self.select_pdf)
         self.extract_button.clicked.connect(self.extract_words)
         self.save_button.clicked.connect(self.show_and_save_unknown_words)
+        self.clear_cache_button.clicked.connect(self.clear_page_cache)
+        self.pause_button.clicked.connect(self.toggle_pause)
+        self.cancel_button.clicked.connect(self.cancel_job)
+        self.filter_edit.filter_changed.connect(self.apply_filter)
+        self.export_stats_button.clicked.connect(self.export_stats)
 
         self.pdf_path = ""
         self.worker = None
+        self.trans_worker = None
         self.total_pages = 0
         self.word_counter = None
         self.unknown_word_list = []
+        self.unknown_index = {}  # 单词 -> 在unknown_word_list中的下标（也是生词表模型中的源行号）
+        self.pending_translations = {}  # 源行号 -> 新到达、还没刷新到表格的翻译
+        self.job_paused = False
+        self.run_stats = None  # 最近一次提取（及其在线翻译）的 ExtractStats
+        self.run_info = {}     # 导出统计时附带的文件名/页码范围
+
+        # 翻译结果陆续到达时合并刷新，避免每个词都重绘整个面板
+        self.unknown_dirty = False
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(200)
+        self.refresh_timer.timeout.connect(self.refresh_unknown_table)
+
+        # 提取过程中逐页到达的词频增量先累加，按固定间隔刷新面板
+        self.partial_counter = Counter()
+        self.partial_defs = {}   # 提取中已查过的本地释义，每次刷新只查新出现的词
+        self.partial_dirty = False
+        self.partial_timer = QTimer(self)
+        self.partial_timer.setInterval(STREAM_REFRESH_MS)
+        self.partial_timer.timeout.connect(self.refresh_partial)
+        self.update_job_buttons()
+        self.update_counts()
+
+    def set_panels(self, known_rows=(), unknown_rows=(), status=""):
+        self.known_model.set_rows(known_rows)
+        self.unknown_model.set_rows(unknown_rows)
+        self.pending_translations = {}
+        self.unknown_dirty = False
+        self.status_label.setText(status)
+        self.update_counts()
+
+    def update_counts(self):
+        def count_text(model):
+            total = model.total_count()
+            shown = model.rowCount()
+            return f"{total}" if shown == total else f"{shown}/{total}"
+        self.left_label.setText(f"【熟词（含翻译，数量：{count_text(self.known_model)}{self.count_suffix}）】")
+        self.right_label.setText(f"【生词（含翻译，数量：{count_text(self.unknown_model)}{self.count_suffix}）】")
+
+    def apply_filter(self, text):
+        self.known_model.set_filter(text)
+        self.unknown_model.set_filter(text)
+        self.update_counts()
 
     def select_pdf(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "选择PDF文件", "", "PDF Files (*.pdf)")
         if file_path:
+            # 换了文件，旧文件的提取/翻译不再需要
+            self.stop_extraction()
+            self.stop_translation()
+            self.update_job_buttons()
+            self.progress_bar.setValue(0)
+            self.save_button.setEnabled(False)
+            self.unknown_word_list = []
             self.pdf_path = file_path
             self.label.setText(f"📄 当前文件：{os.path.basename(file_path)}")
             try:
-                with pdfplumber.open(self.pdf_path) as pdf:
-                    self.total_pages = len(pdf.pages)
-                self.left_label.setText("【熟词（含翻译，数量：0）】")
-                self.right_label.setText("【生词（含翻译，数量：0）】")
-                self.known_edit.setText(f"✅ 已加载文件（共 {self.total_pages} 页）：{self.pdf_path}\n")
-                self.unknown_edit.clear()
+                with open_text_doc(self.pdf_path, self.backend_combo.currentData()) as pdf:
+                    self.total_pages = pdf.page_count
+                self.set_panels(status=f"✅ 已加载文件（共 {self.total_pages} 页）：{self.pdf_path}")
             except Exception as e:
-                self.known_edit.setText(f"❌ 无法读取PDF页数：{e}")
-                self.unknown_edit.clear()
+                self.set_panels(status=f"❌ 无法读取PDF页数：{e}")
 
     def extract_words(self):
-        global USER_KNOWN_WORDS
-        USER_KNOWN_WORDS = load_known_words(USER_KNOWN_WORDS_FILE)  # 动态刷新
+        USER_KNOWN_WORDS.refresh()  # 动态刷新（文件没变时只stat一次）
         if not self.pdf_path:
             QMessageBox.warning(self, "⚠️ 未选择文件", "请先选择一个PDF文件")
             return
@@ -282,47 +559,218 @@ class PDFWordExtractor(QWidget):
             QMessageBox.warning(self, "❌ 页码范围错误", f"页码范围应在 1 ~ {self.total_pages} 之间，且起始页不大于结束页")
             return
 
-        self.left_label.setText("【熟词（含翻译，数量：0）】")
-        self.right_label.setText("【生词（含翻译，数量：0）】")
-        self.known_edit.setText(f"⏳ 正在分析第 {start_page} 页至第 {end_page} 页内容...\n")
-        self.unknown_edit.clear()
+        # 换了页码范围或重复点击：先停掉还在跑的旧任务，CPU只给新任务
+        self.stop_extraction()
+        self.stop_translation()
+        self.update_job_buttons()
+        self.count_suffix = ""
+        self.set_panels(status=f"⏳ 正在分析第 {start_page} 页至第 {end_page} 页内容...")
+        self.run_stats = None
+        self.run_info = {"pdf": self.pdf_path, "start_page": start_page, "end_page": end_page,
+                         "processes": EXTRACT_PROCESSES, "backend": self.backend_combo.currentData(),
+                         "engine": self.engine_combo.currentData()}
+        self.update_diagnostics()
         self.progress_bar.setValue(0)
         self.save_button.setEnabled(False)
-        self.worker = ExtractWorker(self.pdf_path, start_page, end_page)
+        self.partial_counter = Counter()
+        self.partial_defs = {}
+        self.partial_dirty = False
+        # 以self为父对象：取消后线程对象由Qt托管到真正结束，再自行释放
+        self.worker = ExtractWorker(self.pdf_path, start_page, end_page,
+                                    backend=self.backend_combo.currentData(),
+                                    engine=self.engine_combo.currentData(), parent=self)
         self.worker.progress.connect(self.progress_bar.setValue)
+        self.worker.partial.connect(self.on_partial)
         self.worker.result.connect(self.display_result)
+        self.worker.finished.connect(self.worker.deleteLater)
         self.worker.start()
-
-    def display_result(self, word_counter: Counter, pdf_path: str):
-        global USER_KNOWN_WORDS
-        USER_KNOWN_WORDS = load_known_words(USER_KNOWN_WORDS_FILE)  # 动态刷新
+        self.update_job_buttons()
+
+    def stop_extraction(self):
+        """取消当前提取：断开信号后通知线程在下一页前退出，不等它结束"""
+        if self.worker is not None:
+            self.worker.progress.disconnect(self.progress_bar.setValue)
+            self.worker.partial.disconnect(self.on_partial)
+            self.worker.result.disconnect(self.display_result)
+            self.worker.control.cancel()
+            self.worker = None
+        self.partial_timer.stop()
+
+    def active_controls(self):
+        return [w.control for w in (self.worker, self.trans_worker) if w is not None]
+
+    def toggle_pause(self):
+        self.job_paused = not self.job_paused
+        for control in self.active_controls():
+            if self.job_paused:
+                control.pause()
+            else:
+                control.resume()
+        self.update_job_buttons()
+
+    def cancel_job(self):
+        if self.worker is not None:
+            self.stop_extraction()
+            self.count_suffix = ""
+            self.set_panels(status="⏹ 已取消提取")
+            self.progress_bar.setValue(0)
+        if self.trans_worker is not None:
+            # 已翻译的保留，没翻译完的标成已取消，保存时不会把"翻译中"写进文件/熟词库
+            self.stop_translation()
+            for word, _, trans in list(self.unknown_word_list):
+                if trans == TRANSLATING:
+                    self.on_word_translated(word, TRANSLATION_CANCELLED)
+            self.refresh_unknown_table()
+            self.status_label.setText("⏹ 已取消在线翻译")
+            self.save_button.setEnabled(True)
+        self.update_job_buttons()
+
+    def update_job_buttons(self):
+        running = bool(self.active_controls())
+        if not running:
+            self.job_paused = False
+        self.pause_button.setEnabled(running)
+        self.cancel_button.setEnabled(running)
+        self.pause_button.setText("▶ 继续" if self.job_paused else "⏸ 暂停")
+
+    def on_partial(self, delta: Counter):
+        self.partial_counter.update(delta)
+        self.partial_dirty = True
+        # 第一批结果立即显示，之后按 STREAM_REFRESH_MS 节流
+        if not self.partial_timer.isActive():
+            self.refresh_partial()
+            self.partial_timer.start()
+
+    def refresh_partial(self):
+        """用目前已统计的页刷新熟词/生词面板（只用本地释义，在线翻译等提取完成后再做）"""
+        if not self.partial_dirty:
+            return
+        self.partial_dirty = False
+        known_rows, unknown_rows = split_known_unknown(
+            self.partial_counter, (SYS_KNOWN_WORDS, USER_KNOWN_WORDS), self.partial_lookup)
+        self.count_suffix = "，提取中…"
+        self.set_panels(self.known_table_rows(known_rows),
+                        [(w, f, t or AWAIT_TRANSLATION) for w, f, t in unknown_rows],
+                        self.status_label.text())
+
+    def partial_lookup(self, word):
+        """dict_lookup 按词记忆：面板每 STREAM_REFRESH_MS 整体重排一次，词典只对新词查一次"""
+        defs = self.partial_defs
+        if word not in defs:
+            defs[word] = dict_lookup(word)
+        return defs[word]
+
+    @staticmethod
+    def known_table_rows(known_rows):
+        return [(word, freq, trans or '[本地词典无翻译]') for word, freq, trans in known_rows]
+
+    def display_result(self, word_counter: Counter, pdf_path: str, stats: ExtractStats):
+        USER_KNOWN_WORDS.refresh()  # 动态刷新
+        self.partial_timer.stop()
+        self.partial_counter = Counter()
+        self.partial_defs = {}
+        self.partial_dirty = False
+        self.worker = None
+        self.count_suffix = ""
         if "❌ 提取失败" in word_counter:
-            self.left_label.setText("【熟词（含翻译，数量：0）】")
-            self.right_label.setText("【生词（含翻译，数量：0）】")
-            self.known_edit.setText("❌ 提取失败，请检查PDF是否包含可识别文本内容。")
-            self.unknown_edit.clear()
+            self.set_panels(status="❌ 提取失败，请检查PDF是否包含可识别文本内容。")
             self.save_button.setEnabled(False)
+            self.update_job_buttons()
             return
         self.word_counter = word_counter
+        with stats.timer("split"):
+            known_rows, unknown_rows = split_known_unknown(
+                word_counter, (SYS_KNOWN_WORDS, USER_KNOWN_WORDS), dict_lookup)
+        stats.counts["known_words"] = len(known_rows)
+        stats.counts["unknown_words"] = len(unknown_rows)
+        self.run_stats = stats
+        self.update_diagnostics()
+        unknown = [(word, freq, trans or TRANSLATING) for word, freq, trans in unknown_rows]
+        pending = [word for word, _, trans in unknown_rows if not trans]
+
+        self.unknown_word_list = unknown
+        self.unknown_index = {w: i for i, (w, _, _) in enumerate(unknown)}
+        self.set_panels(self.known_table_rows(known_rows), unknown,
+                        f"✅ 统计完成：共 {len(word_counter)} 个词" + ("" if known_rows else "，无熟词") +
+                        ("" if unknown else "，无生词"))
+        self.start_translation(pending)
+
+    def start_translation(self, words):
+        """本地词典查不到的生词交给后台线程并发翻译，结果陆续填回生词面板"""
+        self.stop_translation()
+        if not words:
+            self.save_button.setEnabled(True)
+            self.update_job_buttons()
+            return
+        self.save_button.setEnabled(False)
+        self.trans_progress.setValue(0)
+        self.trans_progress.setVisible(True)
+        # 以self为父对象：停止后线程对象由Qt托管到真正结束，再自行释放
+        self.trans_worker = TranslateWorker(words, parent=self)
+        self.trans_worker.translated.connect(self.on_word_translated)
+        self.trans_worker.progress.connect(self.trans_progress.setValue)
+        self.trans_worker.done.connect(self.finish_translation)
+        self.trans_worker.finished.connect(self.trans_worker.deleteLater)
+        if self.job_paused:  # 提取阶段按了暂停，翻译接着保持暂停
+            self.trans_worker.control.pause()
+        self.refresh_timer.start()
+        self.trans_worker.start()
+        self.update_job_buttons()
+
+    def stop_translation(self):
+        if self.trans_worker is not None:
+            self.trans_worker.translated.disconnect(self.on_word_translated)
+            self.trans_worker.progress.disconnect(self.trans_progress.setValue)
+            self.trans_worker.done.disconnect(self.finish_translation)
+            self.trans_worker.stop()
+            self.trans_worker = None
+        self.refresh_timer.stop()
+        self.trans_progress.setVisible(False)
+
+    def on_word_translated(self, word, trans):
+        i = self.unknown_index.get(word)
+        if i is None:
+            return
+        w, freq, _ = self.unknown_word_list[i]
+        self.unknown_word_list[i] = (w, freq, trans)
+        self.pending_translations[i] = trans
+        self.unknown_dirty = True
+
+    def finish_translation(self, stats):
+        if self.run_stats is not None:
+            self.run_stats.merge(stats)
+            self.update_diagnostics()
+        self.refresh_timer.stop()
+        self.refresh_unknown_table()
+        self.trans_progress.setVisible(False)
         self.save_button.setEnabled(True)
-        known, unknown = [], []
-        for word in sorted(word_counter.keys()):  # 字典序
-            freq = word_counter[word]
-            if (word in SYS_KNOWN_WORDS) or (word in USER_KNOWN_WORDS):
-                trans = DICT.get(word, "[本地词典无翻译]")
-                known.append(f"{word:<18} {freq:<4} {trans}")
-            else:
-                trans = DICT.get(word, "")
-                if not trans:
-                    trans = google_translate(word)
-                unknown.append((word, freq, trans))
+        self.trans_worker = None
+        self.update_job_buttons()
 
-        self.left_label.setText(f"【熟词（含翻译，数量：{len(known)}）】")
-        self.right_label.setText(f"【生词（含翻译，数量：{len(unknown)}）】")
+    def update_diagnostics(self):
+        if self.run_stats is None:
+            self.diag_edit.clear()
+            self.export_stats_button.setEnabled(False)
+            return
+        self.diag_edit.setPlainText("\n".join(self.run_stats.summary_lines()))
+        self.export_stats_button.setEnabled(True)
 
-        self.unknown_word_list = unknown
-        self.known_edit.setText("\n".join(known) if known else "无熟词")
-        self.unknown_edit.setText("\n".join([f"{w:<18} {f:<4} {t}" for w, f, t in unknown] if unknown else ["无生词"]))
+    def export_stats(self):
+        if self.run_stats is None:
+            return
+        base_name = os.path.splitext(os.path.basename(self.pdf_path))[0]
+        out_path, _ = QFileDialog.getSaveFileName(self, "导出统计...", base_name + "_提取统计.json", "JSON Files (*.json)")
+        if out_path:
+            self.run_stats.to_json(out_path, **self.run_info)
+            QMessageBox.information(self, "导出成功", f"统计已保存至：\n{out_path}")
+
+    def refresh_unknown_table(self):
+        """把攒下的翻译一次性写进生词表模型"""
+        if self.unknown_dirty:
+            self.unknown_model.update_translations(self.pending_translations)
+            self.pending_translations = {}
+            self.unknown_dirty = False
+            self.update_counts()
 
     def show_and_save_unknown_words(self):
         if not self.unknown_word_list:
@@ -342,26 +790,52 @@ class PDFWordExtractor(QWidget):
                             f.write(line.strip() + "\n")
                     QMessageBox.information(self, "保存成功", f"翻译结果已保存至：\n{out_path}")
             if selected_pairs:
-                # 追加到shuci02.txt，去重
-                existing = load_known_words(USER_KNOWN_WORDS_FILE)
-                new_lines = []
-                for word, trans in selected_pairs:
-                    if word not in existing:
-                        new_lines.append(f"{word} {trans}")
-                if new_lines:
-                    save_user_known_words(new_lines)
+                # 追加到shuci02.txt，已有的单词跳过
+                if USER_KNOWN_WORDS.add_many(selected_pairs):
                     QMessageBox.information(self, "同步成功", f"已将勾选生词加入新熟词库 shuci02.txt（下次统计会自动识别为熟词）")
                 else:
                     QMessageBox.information(self, "未新增熟词", "勾选生词均已存在于熟词库，无需重复添加。")
             else:
                 QMessageBox.information(self, "未保存", "未选择任何生词，未保存文件/未同步熟词库。")
 
+    def clear_page_cache(self):
+        if self.worker is not None:
+            QMessageBox.warning(self, "⚠️ 正在提取", "请等待当前提取完成后再清空缓存")
+            return
+        n_pages, size = PAGE_CACHE.stats()
+        PAGE_CACHE.clear()
+        QMessageBox.information(self, "已清空缓存", f"已删除 {n_pages} 页缓存（约 {size / 1024 / 1024:.1f} MB）")
+
+# ========== 模糊查词索引后台加载（只打开 python cidian_index.py 建好的索引，没有就不提供近似词） ==========
+class FuzzyIndexLoader(QThread):
+    loaded = pyqtSignal(object)
+
+    def run(self):
+        try:
+            self.loaded.emit(open_fuzzy(DICT_FILE, DICT, build=False))
+        except Exception as e:
+            self.loaded.emit(None)
+
+# ========== 词形还原索引后台加载（只打开 python cidian_index.py 建好的索引；没有或就绪前查词只做原词精确匹配） ==========
+class LemmaIndexLoader(QThread):
+    loaded = pyqtSignal(object)
+
+    def run(self):
+        try:
+            self.loaded.emit(open_lemma_index(DICT_FILE, DICT, build=False))
+        except Exception as e:
+            self.loaded.emit(None)
+
+def set_lemma_index(index):
+    global LEMMAS
+    LEMMAS = index
+
 # ========== 词典查词/网页翻译界面 ==========
 class NightDict(QWidget):
+    index_missing = pyqtSignal(str)   # 没建好的索引名，由主窗口在状态栏提示
     def __init__(self):
         super().__init__()
         self.dict_en2zh = DICT
-        self.translator = Translator()
         font = QFont('微软雅黑', 12)
         self.setFont(font)
         self.setStyleSheet("""
@@ -375,6 +849,14 @@ class NightDict(QWidget):
         title.setStyleSheet("font-size: 20px; color: #90caf9; margin-bottom:8px;")
         self.input = QLineEdit(self)
         self.input.setPlaceholderText('请输入英文单词或短语...')
+        # 边输入边联想：候选直接由编译词典的有序词头二分取前缀得到，每次按键不扫描全表
+        self.completer_model = QStringListModel(self)
+        self.completer = QCompleter(self.completer_model, self)
+        self.completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self.completer.setMaxVisibleItems(AUTOCOMPLETE_TOP_K)
+        self.input.textEdited.connect(self.update_suggestions)
+        self.input.setCompleter(self.completer)
+        self.completer.activated[str].connect(lambda _: self.lookup())
         self.btn = QPushButton('查询', self)
         self.output = QTextEdit(self)
         self.output.setReadOnly(True)
@@ -385,25 +867,85 @@ class NightDict(QWidget):
         layout.addWidget(self.output)
         layout.setSpacing(12)
         self.setLayout(layout)
+        # 在线查询放到后台线程，新查询作废旧查询；输入停顿后只自动查本地词典，回车/按钮才在线查询
+        self.online = AsyncLookup(self.fetch_online, self)
+        self.online.finished.connect(self.show_online_result)
+        self.debounce = make_debounce_timer(self, self.lookup_local)
         self.btn.clicked.connect(self.lookup)
         self.input.returnPressed.connect(self.lookup)
+        self.input.textEdited.connect(self.debounce.start)
+
+        self.fuzzy = None
+        self.fuzzy_loader = FuzzyIndexLoader(self)
+        self.fuzzy_loader.loaded.connect(self.set_fuzzy_index)
+        self.fuzzy_loader.start()
+
+    def set_fuzzy_index(self, index):
+        self.fuzzy = index
+        if index is None:
+            self.index_missing.emit("近似词")
+
+    def update_suggestions(self, text):
+        prefix = text.strip().lower()
+        words = self.dict_en2zh.prefix_search(prefix, AUTOCOMPLETE_TOP_K) if prefix else []
+        self.completer_model.setStringList(words)
+
+    def closeEvent(self, event):
+        self.online.shutdown()  # 作废未返回的查询，排队中的不再执行，线程池不拖住进程退出
+        super().closeEvent(event)
+
+    def fetch_online(self, text):
+        """后台线程中执行：Google翻译（带缓存、限速和熔断）"""
+        return cached_translate("google", text, fetch_google)
 
     def lookup(self):
+        """回车/查询按钮：本地查不到时在线翻译"""
+        self.run_lookup(online=True)
+
+    def lookup_local(self):
+        """停止输入后的自动查词只查本地：半截单词不发到网上，也不写进翻译缓存"""
+        self.run_lookup(online=False)
+
+    def run_lookup(self, online):
+        """本地词典/词形还原/近似词都在界面线程同步完成（微秒级），查不到才交给后台在线查询"""
+        self.debounce.stop()
+        self.online.cancel()  # 还没返回的上一次在线查询作废
         text = self.input.text().strip()
         if not text:
             self.output.setText("请输入要查询的英文内容")
             return
-        result = self.dict_en2zh.get(text.lower())
+        headword, result = resolve(self.dict_en2zh, LEMMAS, text)
         if result:
+            if headword != text.lower():
+                result = f"{text} → {headword}\n{result}"
             self.output.setText(result)
+            return
+        # 近似词先显示（拼写错误一眼可见），但本地词典没收录的真词照样在线翻译
+        suggestions = self.fuzzy.suggest(text, FUZZY_TOP_K) if self.fuzzy is not None else []
+        lines = ["未找到本地词条"]
+        if suggestions:
+            lines[0] += "，您是不是要找："
+            for _, word in suggestions:
+                lines.append(f"{word:<18} {self.dict_en2zh.get(word, '')}")
+        if not online:
+            lines.append("（按回车或点击查询在线翻译）")
+            self.output.setText("\n".join(lines))
+            return
+        reason = offline_reason("google")
+        if reason:
+            # 离线模式或熔断中：不等超时，直接给本地结果
+            lines.append(f"（{reason}，未在线翻译）")
+            self.output.setText("\n".join(lines))
+            return
+        lines.append("正在使用Google翻译...\n")
+        self.output.setText("\n".join(lines))
+        self.online.submit(text)
+
+    def show_online_result(self, text, translation, error):
+        if error is None:
+            self.output.append(f"【Google翻译】\n{translation}")
         else:
-            self.output.setText("未找到本地词条，正在使用Google翻译...\n")
-            QApplication.processEvents()
-            try:
-                translation = self.translator.translate(text, src='en', dest='zh-cn').text
-                self.output.append(f"【Google翻译】\n{translation}")
-            except Exception as e:
-                self.output.append(f"【Google翻译失败】\n{e}")
+            self.output.append(f"【Google翻译失败】\n{error}")
 
 # ========== 主程序 ==========
 from PyQt5.QtWidgets import QTabWidget
@@ -414,12 +956,42 @@ class MainTabWindow(QMainWindow):
         self.setWindowTitle("学术英语助手 | 词典 + PDF单词统计（夜间美观版）")
         self.resize(1300, 820)
         self.tabs = QTabWidget()
-        self.tabs.addTab(NightDict(), "英汉词典查询")
+        self.dict_tab = NightDict()
+        self.tabs.addTab(self.dict_tab, "英汉词典查询")
         self.tabs.addTab(PDFWordExtractor(), "PDF词频/生词翻译")
+        # 仅离线：两个页面都不再发在线翻译请求，没网时查词/提取不用等超时
+        self.offline_check = QCheckBox("仅离线")
+        self.offline_check.setToolTip("勾选后只用本地词典，不发任何在线翻译请求")
+        self.offline_check.toggled.connect(set_offline)
+        self.tabs.setCornerWidget(self.offline_check)
         self.setCentralWidget(self.tabs)
+        # 近似词/词形还原索引没建好时在状态栏提示构建命令
+        self.missing_indexes = []
+        self.dict_tab.index_missing.connect(self.show_index_hint)
+        # 词形还原索引放到后台打开，不拖慢首屏；界面里从不构建，提取用的子进程重新导入本模块时也不碰它
+        self.lemma_loader = LemmaIndexLoader(self)
+        self.lemma_loader.loaded.connect(self.set_lemma_index)
+        self.lemma_loader.start()
+
+    def set_lemma_index(self, index):
+        set_lemma_index(index)
+        if index is None:
+            self.show_index_hint("词形还原")
+
+    def show_index_hint(self, name):
+        """索引没建或比词典旧：查词照常可用，在状态栏提示怎么构建"""
+        self.missing_indexes.append(name)
+        self.statusBar().showMessage(f"⚠️ 未找到{'、'.join(self.missing_indexes)}索引，相关功能暂不可用；"
+                                     f"在程序目录运行 python cidian_index.py {DICT_FILE} 后重启即可")
+
+    def closeEvent(self, event):
+        # 标签页里的 NightDict 收不到关闭事件，由主窗口替它停掉在线查询线程池
+        self.dict_tab.online.shutdown()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = MainTabWindow()
     window.show()
+    QTimer.singleShot(0, lambda: report_startup(_T0))
     sys.exit(app.exec_())
@@ -1,10 +1,7 @@
 import sys, os, time
+_T0 = time.perf_counter()  # 首屏计时起点
 import pdfplumber
-import spacy
-import nltk
 from collections import Counter
-from nltk.corpus import words as nltk_words
-from nltk.corpus import stopwords
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QPushButton, QLabel, QVBoxLayout,
     QWidget, QFileDialog, QTextEdit, QMessageBox, QProgressBar,
@@ -12,34 +9,18 @@ from PyQt5.QtWidgets import (
     QListWidgetItem
 )
 from PyQt5.QtGui import QPalette, QColor, QFont
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QUrl
-from PyQt5.QtWebEngineWidgets import QWebEngineView
-from googletrans import Translator
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QUrl, QTimer
+from cidian_index import open_dict
+from fanyi import TranslationUnavailable, cached_translate, fetch_google, google_translate_many, offline_reason
+from tiqu_core import DEFAULT_PROCESSES, count_lemmas, parallel_extract, use_parallel
+from ziyuan import get_extract_resources, report_startup, web_engine_view_class
+from yibu_chaci import AsyncLookup, make_debounce_timer
 import urllib.parse
 
-# ========== 环境和资源初始化 ==========
-nltk.download('words')
-nltk.download('stopwords')
-nlp = spacy.load("en_core_web_sm")
-english_vocab = set(w.lower() for w in nltk_words.words())
-stop_words = set(stopwords.words('english'))
-translator = Translator()
+# ========== 资源初始化 ==========
+# spaCy / NLTK词表 / googletrans 由 ziyuan 在第一次用到时才加载
 
 # ========== 词典与熟词库加载 ==========
-def load_dict(file):
-    d_en2zh = {}
-    with open(file, encoding='utf-8') as f:
-        for idx, line in enumerate(f, 1):
-            line = line.strip()
-            if not line: continue
-            parts = line.split('\t', 1)
-            if len(parts) != 2: continue
-            en, zh = parts
-            en, zh = en.strip(), zh.strip()
-            if en and zh:
-                d_en2zh[en.lower()] = zh
-    return d_en2zh
-
 def load_known_words(path):
     known_words = set()
     with open(path, encoding="utf-8") as f:
@@ -49,42 +30,36 @@ def load_known_words(path):
                 known_words.add(word)
     return known_words
 
-DICT = load_dict("dict.txt")
+DICT = open_dict("dict.txt")
 KNOWN_WORDS = load_known_words("46merged.txt")
 
-def google_translate(word):
-    try:
-        result = translator.translate(word, src='en', dest='zh-cn')
-        return result.text
-    except Exception as e:
-        return "【翻译失败】"
-
 # ========== PDF单词提取后台线程 ==========
 class ExtractWorker(QThread):
     progress = pyqtSignal(int)
     result = pyqtSignal(Counter, str)
 
-    def __init__(self, pdf_path, start_page, end_page):
+    def __init__(self, pdf_path, start_page, end_page, processes=DEFAULT_PROCESSES):
         super().__init__()
         self.pdf_path = pdf_path
         self.start_page = start_page
         self.end_page = end_page
+        self.processes = processes
 
     def run(self):
         try:
-            word_counter = Counter()
-            with pdfplumber.open(self.pdf_path) as pdf:
-                pages = pdf.pages[self.start_page - 1 : self.end_page]
-                for i, page in enumerate(pages):
-                    text = page.extract_text()
-                    if text:
-                        doc = nlp(text)
-                        for token in doc:
-                            if token.is_alpha and token.is_ascii and len(token) > 1:
-                                lemma = token.lemma_.lower()
-                                if lemma in english_vocab and lemma not in stop_words:
-                                    word_counter[lemma] += 1
-                    self.progress.emit(int((i + 1) / len(pages) * 100))
+            if use_parallel(self.end_page - self.start_page + 1, self.processes):
+                word_counter = parallel_extract(self.pdf_path, self.start_page, self.end_page,
+                                                self.processes, self.progress.emit)
+            else:
+                word_counter = Counter()
+                nlp, english_vocab, stop_words = get_extract_resources()
+                with pdfplumber.open(self.pdf_path) as pdf:
+                    pages = pdf.pages[self.start_page - 1 : self.end_page]
+                    for i, page in enumerate(pages):
+                        text = page.extract_text()
+                        if text:
+                            count_lemmas(nlp(text), english_vocab, stop_words, word_counter)
+                        self.progress.emit(int((i + 1) / len(pages) * 100))
             self.result.emit(word_counter, self.pdf_path)
         except Exception as e:
             self.result.emit(Counter({"❌ 提取失败": 1}), self.pdf_path)
@@ -99,16 +74,20 @@ class TranslateWorker(QThread):
         self.unknown_word_list = unknown_word_list
 
     def run(self):
-        lines = []
-        total = len(self.unknown_word_list)
-        for i, (word, freq) in enumerate(self.unknown_word_list):
-            # 优先查词典
-            trans = DICT.get(word, "")
-            if not trans:
-                trans = google_translate(word)
-            lines.append((word, freq, trans))
-            percent = int((i + 1) / total * 100)
-            self.progress.emit(percent)
+        # 优先查词典，查不到的按批在线翻译
+        local = {word: DICT.get(word, "") for word, _ in self.unknown_word_list}
+        missing = [word for word, trans in local.items() if not trans]
+        total = len(local) or 1
+        done = [len(local) - len(missing)]
+
+        def batch_done(part):
+            local.update(part)
+            done[0] += len(part)
+            self.progress.emit(int(done[0] / total * 100))
+
+        google_translate_many(missing, on_result=batch_done)
+        lines = [(word, freq, local[word]) for word, freq in self.unknown_word_list]
+        self.progress.emit(100)
         self.finished.emit(lines)
 
 # ========== 生词选择保存对话框 ==========
@@ -312,7 +291,6 @@ class NightDict(QWidget):
     def __init__(self):
         super().__init__()
         self.dict_en2zh = DICT
-        self.translator = Translator()
         font = QFont('微软雅黑', 12)
         self.setFont(font)
         self.setStyleSheet("""
@@ -331,8 +309,7 @@ class NightDict(QWidget):
         self.btn = QPushButton('查询', self)
         self.output = QTextEdit(self)
         self.output.setReadOnly(True)
-        self.webview = QWebEngineView(self)
-        self.webview.setVisible(False)
+        self.webview = None  # 第一次需要网页兜底时才创建（WebEngine启动很重）
         self.close_web_btn = QPushButton('关闭在线翻译网页', self)
         self.close_web_btn.setVisible(False)
         self.close_web_btn.setStyleSheet("""
@@ -352,22 +329,53 @@ class NightDict(QWidget):
         btn_row.addWidget(self.close_web_btn)
         btn_row.addStretch(1)
         main_layout.addLayout(btn_row)
-        main_layout.addWidget(self.webview)
         main_layout.setSpacing(12)
         self.setLayout(main_layout)
+        self.main_layout = main_layout
 
+        # 在线查询放到后台线程，新查询作废旧查询；输入停顿后只自动查本地词典，回车/按钮才在线查询
+        self.online = AsyncLookup(self.fetch_online, self)
+        self.online.finished.connect(self.show_online_result)
+        self.debounce = make_debounce_timer(self, self.lookup_local)
         self.btn.clicked.connect(self.lookup)
         self.input.returnPressed.connect(self.lookup)
+        self.input.textEdited.connect(self.debounce.start)
         self.close_web_btn.clicked.connect(self.hide_webview)
 
+    def ensure_webview(self):
+        if self.webview is None:
+            self.webview = web_engine_view_class()(self)
+            self.main_layout.addWidget(self.webview)
+        return self.webview
+
     def hide_webview(self):
-        self.webview.setVisible(False)
+        if self.webview is not None:
+            self.webview.setVisible(False)
         self.close_web_btn.setVisible(False)
         self.output.append("已关闭在线翻译网页。")
 
+    def closeEvent(self, event):
+        self.online.shutdown()  # 作废未返回的查询，排队中的不再执行，线程池不拖住进程退出
+        super().closeEvent(event)
+
+    def fetch_online(self, text):
+        """后台线程中执行：Google翻译（带缓存、限速和熔断）"""
+        return cached_translate("google", text, fetch_google)
+
     def lookup(self):
+        """回车/查询按钮：本地查不到时在线翻译"""
+        self.run_lookup(online=True)
+
+    def lookup_local(self):
+        """停止输入后的自动查词只查本地：半截单词不发到网上，也不写进翻译缓存"""
+        self.run_lookup(online=False)
+
+    def run_lookup(self, online):
+        self.debounce.stop()
+        self.online.cancel()  # 还没返回的上一次在线查询作废
         text = self.input.text().strip()
-        self.webview.setVisible(False)
+        if self.webview is not None:
+            self.webview.setVisible(False)
         self.close_web_btn.setVisible(False)
         if not text:
             self.output.setText("请输入要查询的英文内容")
@@ -376,24 +384,30 @@ class NightDict(QWidget):
         if result:
             self.output.setText(result)
             return
+        if not online:
+            self.output.setText("未找到本地词条（按回车或点击查询在线翻译）")
+            return
+        reason = offline_reason("google")
+        if reason:
+            # 离线模式或熔断中：不等超时，也不加载在线网页，直接给本地结果
+            self.output.setText(f"未找到本地词条（{reason}，未在线翻译）")
+            return
         self.output.setText("未找到本地词条，正在使用Google翻译...\n")
-        QApplication.processEvents()
-        show_web = False
-        translation = None
-        try:
-            translation = self.translator.translate(text, src='en', dest='zh-cn').text
+        self.online.submit(text)
+
+    def show_online_result(self, text, translation, error):
+        if error is None:
             self.output.append(f"【Google翻译】\n{translation}")
-            if translation.strip().lower() == text.strip().lower():
-                show_web = True
-        except Exception as e:
-            self.output.append(f"【Google翻译失败】\n{e}")
-            show_web = True
+            show_web = translation.strip().lower() == text.strip().lower()
+        else:
+            self.output.append(f"【Google翻译失败】\n{error}")
+            show_web = not isinstance(error, TranslationUnavailable)  # 刚熔断就别再加载在线网页
         if show_web:
             self.output.append("正在加载必应在线翻译网页，请稍候...")
-            QApplication.processEvents()
             url = f"https://cn.bing.com/translator?from=en&to=zh-Hans&text={urllib.parse.quote(text)}"
-            self.webview.load(QUrl(url))
-            self.webview.setVisible(True)
+            webview = self.ensure_webview()
+            webview.load(QUrl(url))
+            webview.setVisible(True)
             self.close_web_btn.setVisible(True)
 
 # ========== 集成主界面 ==========
@@ -403,12 +417,21 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("学术英语助手 | 词典 + PDF单词统计（夜间美观版）")
         self.resize(950, 700)
         tabs = QTabWidget()
-        tabs.addTab(NightDict(), "英汉词典查词")
+        self.dict_tab = NightDict()
+        tabs.addTab(self.dict_tab, "英汉词典查词")
         tabs.addTab(PDFWordExtractor(), "PDF词频/生词翻译")
         self.setCentralWidget(tabs)
 
+    def closeEvent(self, event):
+        # 标签页里的 NightDict 收不到关闭事件，由主窗口替它停掉在线查询线程池
+        self.dict_tab.online.shutdown()
+        super().closeEvent(event)
+
 if __name__ == "__main__":
+    # 允许在 QApplication 创建之后再懒加载 QtWebEngineWidgets
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
+    QTimer.singleShot(0, lambda: report_startup(_T0))
     sys.exit(app.exec_())
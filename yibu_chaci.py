@@ -0,0 +1,58 @@
+"""查词窗口的在线查询：放到后台线程执行，输入防抖，被新查询取代的旧结果直接丢弃（各 NightDict 共用）"""
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+LOOKUP_DEBOUNCE_MS = 300   # 停止输入这么久后才自动查词
+LOOKUP_THREADS = 2         # 在线查询线程数；排队中的旧查询在开始前就会被跳过
+
+class AsyncLookup(QObject):
+    """后台执行 fetch(text)：每次 submit 分配一个新的查询号，只有最新一次查询的结果会发出 finished
+
+    finished(查询文本, 结果, 异常)：成功时异常为None，失败时结果为None。
+    结果经Qt信号回到界面线程，槽函数里可以直接操作控件。
+    """
+    finished = pyqtSignal(str, object, object)
+    _done = pyqtSignal(int, str, object, object)
+
+    def __init__(self, fetch, parent=None):
+        super().__init__(parent)
+        self.fetch = fetch
+        self._token = 0
+        self._pool = ThreadPoolExecutor(max_workers=LOOKUP_THREADS)
+        self._done.connect(self._on_done)
+
+    def submit(self, text):
+        """提交一次在线查询，之前还没返回的查询作废"""
+        self._token += 1
+        self._pool.submit(self._run, self._token, text)
+        return self._token
+
+    def cancel(self):
+        """作废还没返回的查询（例如本地已经查到了）"""
+        self._token += 1
+
+    def _run(self, token, text):
+        if token != self._token:
+            return  # 排队期间又有了新查询，不必再发请求
+        try:
+            result, error = self.fetch(text), None
+        except Exception as e:
+            result, error = None, e
+        self._done.emit(token, text, result, error)
+
+    def _on_done(self, token, text, result, error):
+        if token == self._token:
+            self.finished.emit(text, result, error)
+
+    def shutdown(self):
+        self.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+def make_debounce_timer(parent, slot, ms=LOOKUP_DEBOUNCE_MS):
+    """单次定时器：每次 start() 重新计时，停止输入 ms 毫秒后调用 slot"""
+    timer = QTimer(parent)
+    timer.setSingleShot(True)
+    timer.setInterval(ms)
+    timer.timeout.connect(slot)
+    return timer
@@ -0,0 +1,104 @@
+"""重资源懒加载：spaCy、NLTK词表、googletrans、WebEngine 都等第一次真正用到时才加载
+
+各界面模块启动时只导入本模块，不碰任何重依赖；查词页打开时一样都不会加载。
+"""
+import threading
+import time
+
+STARTUP_TARGET_MS = 800   # 从进程启动到主窗口显示的目标耗时
+
+# 每种资源一把锁：后台线程加载spaCy/下载NLTK语料时，界面线程拿 WebEngine、查词线程拿 Translator 不用陪着等
+_nlp_lock = threading.Lock()
+_nltk_data_lock = threading.Lock()
+_vocab_lock = threading.Lock()
+_stop_words_lock = threading.Lock()
+_fast_counter_lock = threading.Lock()
+_translator_lock = threading.Lock()
+_web_engine_lock = threading.Lock()
+_nlp = None
+_english_vocab = None
+_stop_words = None
+_fast_counter = None
+_translator = None
+_web_engine_view = None
+
+def ensure_nltk_data():
+    """本地没有 words / stopwords 语料时才联网下载"""
+    import nltk
+    with _nltk_data_lock:
+        for corpus in ("words", "stopwords"):
+            try:
+                nltk.data.find(f"corpora/{corpus}")
+            except LookupError:
+                nltk.download(corpus, quiet=True)
+
+def get_nlp():
+    """词频统计用的精简spaCy流水线"""
+    global _nlp
+    with _nlp_lock:
+        if _nlp is None:
+            from tiqu_core import load_count_nlp
+            _nlp = load_count_nlp()
+        return _nlp
+
+def get_english_vocab():
+    global _english_vocab
+    with _vocab_lock:
+        if _english_vocab is None:
+            ensure_nltk_data()
+            from nltk.corpus import words as nltk_words
+            _english_vocab = set(w.lower() for w in nltk_words.words())
+        return _english_vocab
+
+def get_stop_words():
+    global _stop_words
+    with _stop_words_lock:
+        if _stop_words is None:
+            ensure_nltk_data()
+            from nltk.corpus import stopwords
+            _stop_words = set(stopwords.words('english'))
+        return _stop_words
+
+def get_extract_resources():
+    """提取词频需要的 (nlp, english_vocab, stop_words)"""
+    return get_nlp(), get_english_vocab(), get_stop_words()
+
+def get_fast_counter():
+    """快速统计引擎（正则分词+查表词形还原），第一次用到时才构建可计入词元集合"""
+    global _fast_counter
+    with _fast_counter_lock:
+        if _fast_counter is None:
+            from tiqu_fast import FastLemmaCounter
+            _fast_counter = FastLemmaCounter(get_english_vocab(), get_stop_words())
+        return _fast_counter
+
+def get_fast_resources():
+    """快速引擎的 (counter, english_vocab, stop_words)，不加载spaCy"""
+    return get_fast_counter(), get_english_vocab(), get_stop_words()
+
+def get_translator():
+    """进程内共享的 googletrans.Translator"""
+    global _translator
+    with _translator_lock:
+        if _translator is None:
+            from googletrans import Translator
+            _translator = Translator()
+            # 非200响应直接抛出带状态码的异常，fanyi 据此区分 429/5xx 做退避重试
+            _translator.raise_exception = True
+        return _translator
+
+def web_engine_view_class():
+    """QWebEngineView 类；主程序需在创建 QApplication 前设置 Qt.AA_ShareOpenGLContexts"""
+    global _web_engine_view
+    with _web_engine_lock:
+        if _web_engine_view is None:
+            from PyQt5.QtWebEngineWidgets import QWebEngineView
+            _web_engine_view = QWebEngineView
+        return _web_engine_view
+
+def report_startup(t0, target_ms=STARTUP_TARGET_MS):
+    """打印从 t0 到现在的首屏耗时，并与目标比较"""
+    elapsed = (time.perf_counter() - t0) * 1000
+    flag = "✅" if elapsed <= target_ms else "⚠️ 超出目标"
+    print(f"首屏耗时 {elapsed:.0f} ms（目标 {target_ms} ms）{flag}")
+    return elapsed